@@ -2,6 +2,15 @@
 #include <random>
 #include <cmath>
 #include <string>
+#include <cstdint>
+#include <cstdio>
+#include <cstring>
+#include "WeierstrassKernel.hpp"
+
+#ifdef _WIN32
+#include <fcntl.h>
+#include <io.h>
+#endif
 
 #ifndef M_PI
 #define M_PI 3.14159265358979323846
@@ -9,6 +18,16 @@
 
 #define AB (1 + (3.0 * M_PI) / 2)
 
+// Binary output (--binary or --format=f64): a header followed by N + 1 little-endian float64 (x, y) pairs
+//   bytes 0-7:   magic "WEIERF64"
+//   bytes 8-15:  int64 N
+//   bytes 16-23: int64 n
+//   bytes 24-63: float64 a, b, range, min_x, max_x
+#define BINARY_MAGIC "WEIERF64"
+#define BINARY_HEADER_SIZE 64
+// Number of points computed, written and flushed at a time so readers can plot while the rest is computed
+#define BINARY_CHUNK_POINTS 65536
+
 using namespace std;
 
 // Function prototypes
@@ -23,12 +42,19 @@ int random_valid_b(int min_b, int max_b, mt19937 mt);
 double* random_a_b(char* a_p, char* b_p, char* range_p);
 // Weierstrass function: W(a, b, x) = sum_{n=0}^{N} a^n * cos(b^n * pi * x)
 double weierstrass(double a, double b, double x, int n = 0);
-// Weierstrass group function: generates N points in the range [min_x, max_x]
-// Returns an array of size N*2+1, where the first element is N,
+// Weierstrass group function: generates N + 1 points in the range [min_x, max_x]
+// split across threads (threads <= 0: one per hardware thread)
+// Returns an array of size (N+1)*2+1, where the first element is N,
 // followed by pairs of x and y values.
-double* weierstrassGroup(double a, double b, double min_x, double max_x, int n = 0, int N = 100);
+double* weierstrassGroup(double a, double b, double min_x, double max_x, int n = 0, int N = 100, int threads = 1);
 // Function to free the dynamically allocated double pointer
 void freeDblPointer(double* arr);
+// Function to write count 8 byte values to out in little-endian byte order
+bool writeLittleEndian(FILE* out, const void* values, size_t count);
+// Function to write the binary header
+bool writeBinaryHeader(FILE* out, double a, double b, double range, double min_x, double max_x, int n, int N);
+// Function to compute the group chunk by chunk, writing and flushing the (x, y) pairs of each chunk as soon as it is ready
+bool writeBinaryGroup(FILE* out, double a, double b, double range, double min_x, double max_x, int n, int N, int threads);
 
 double random_double(double min, double max, mt19937 mt) {
     uniform_real_distribution<double> dist(min, max);
@@ -85,18 +111,20 @@ double weierstrass(double a, double b, double x, int n) {
     return sum;
 }
 
-double* weierstrassGroup(double a, double b, double min_x, double max_x, int n, int N) {
+double* weierstrassGroup(double a, double b, double min_x, double max_x, int n, int N, int threads) {
     if (N <= 0 || n < 0) return nullptr;
     if (min_x >= max_x) return nullptr;
 
-    double* result = new double[N * 2 + 1];
+    vector<double> x_values(N + 1);
+    vector<double> y_values(N + 1);
+    weierstrassGroupParallel(a, b, min_x, max_x, n, N, x_values.data(), y_values.data(), threads);
+
+    double* result = new double[(N + 1) * 2 + 1];
     result[0] = N; // First element is N
-    double step = (max_x - min_x) / N;
 
     for (int i = 0; i <= N; ++i) {
-        double x = min_x + i * step;
-        result[i * 2 + 1] = x; // x value
-        result[i * 2 + 2] = weierstrass(a, b, x, n); // y value
+        result[i * 2 + 1] = x_values[i]; // x value
+        result[i * 2 + 2] = y_values[i]; // y value
     }
 
     return result;
@@ -106,16 +134,89 @@ void freeDblPointer(double* arr) {
     delete[] arr;
 }
 
+bool writeLittleEndian(FILE* out, const void* values, size_t count) {
+    const uint16_t one = 1;
+    if (*reinterpret_cast<const uint8_t*>(&one) == 1) {
+        return fwrite(values, 8, count, out) == count;
+    }
+
+    const uint8_t* bytes = static_cast<const uint8_t*>(values);
+    for (size_t i = 0; i < count; ++i) {
+        uint8_t swapped[8];
+        for (int j = 0; j < 8; ++j) swapped[j] = bytes[i * 8 + 7 - j];
+        if (fwrite(swapped, 8, 1, out) != 1) return false;
+    }
+    return true;
+}
+
+bool writeBinaryHeader(FILE* out, double a, double b, double range, double min_x, double max_x, int n, int N) {
+    int64_t counts[2] = {N, n};
+    double params[5] = {a, b, range, min_x, max_x};
+
+    if (fwrite(BINARY_MAGIC, 1, 8, out) != 8) return false;
+    if (!writeLittleEndian(out, counts, 2)) return false;
+    return writeLittleEndian(out, params, 5);
+}
+
+bool writeBinaryGroup(FILE* out, double a, double b, double range, double min_x, double max_x, int n, int N, int threads) {
+    if (!writeBinaryHeader(out, a, b, range, min_x, max_x, n, N)) return false;
+    fflush(out);
+
+    WeierstrassTerms terms = weierstrassTerms(a, b, n);
+    double step = (max_x - min_x) / N;
+    int count = N + 1;
+    vector<double> x_values(count);
+    vector<double> y_values(count);
+    vector<double> pairs(static_cast<size_t>(BINARY_CHUNK_POINTS) * 2);
+
+    for (int begin = 0; begin < count; begin += BINARY_CHUNK_POINTS) {
+        int end = min(count, begin + BINARY_CHUNK_POINTS);
+        weierstrassRangeParallel(terms, min_x, step, begin, end, x_values.data(), y_values.data(), threads);
+
+        for (int i = begin; i < end; ++i) {
+            pairs[(i - begin) * 2] = x_values[i];
+            pairs[(i - begin) * 2 + 1] = y_values[i];
+        }
+        if (!writeLittleEndian(out, pairs.data(), static_cast<size_t>(end - begin) * 2)) return false;
+        fflush(out);
+    }
+    return true;
+}
+
 int main(int argc, char* argv[]) {
     // Example usage
+    if (argc < 8) {
+        cerr << "Usage: " << argv[0] << " <a> <b> <range> <min_x> <max_x> <n> <N> [--threads=<count>] [--binary | --format=f64] [--output=<path>]" << endl;
+        return 1;
+    }
      // Default values
     double min_x = strtod(argv[4], nullptr);
     double max_x = strtod(argv[5], nullptr);
     int n = strtol(argv[6], nullptr, 10);
     int N = strtol(argv[7], nullptr, 10);
-    if (argc < 8) {
-        cerr << "Usage: " << argv[0] << " <a> <b> <range> <min_x> <max_x> <n> <N>" << endl;
-        return 1;
+    int threads = 1;
+    bool binary = false;
+    string output_path = "";
+
+    for (int i = 8; i < argc; ++i) {
+        string option = argv[i];
+        if (option.rfind("--threads=", 0) == 0) {
+            threads = strtol(option.c_str() + 10, nullptr, 10); // 0 uses every hardware thread
+        }
+        else if (option == "--binary" || option == "--format=f64") {
+            binary = true;
+        }
+        else if (option.rfind("--output=", 0) == 0) {
+            output_path = option.substr(9);
+            binary = true; // only the binary output can be written to a file
+        }
+        else if (option == "--format=text") {
+            binary = false;
+        }
+        else {
+            cerr << "Error: unknown option " << option << endl;
+            return 1;
+        }
     }
     if (min_x >= max_x) {
         cerr << "Error: min_x must be less than max_x." << endl;
@@ -131,9 +232,28 @@ int main(int argc, char* argv[]) {
     double b = abr[1];
     double range = abr[2];
 
+    if (binary) {
+        FILE* out = stdout;
+        if (!output_path.empty()) out = fopen(output_path.c_str(), "wb");
+        if (out == nullptr) {
+            cerr << "Error: cannot open " << output_path << " for writing." << endl;
+            return 1;
+        }
+#ifdef _WIN32
+        if (out == stdout) _setmode(_fileno(stdout), _O_BINARY);
+#endif
+        bool written = writeBinaryGroup(out, a, b, range, min_x, max_x, n, N, threads);
+        if (out != stdout) fclose(out);
+        if (!written) {
+            cerr << "Error: failed to write the binary output." << endl;
+            return 1;
+        }
+        return 0;
+    }
+
     printf("Random a: %.2f, b: %d, range: %d\n", a, static_cast<int>(b), static_cast<int>(range));
 
-    double* group = weierstrassGroup(a, b, min_x, max_x, n, N);
+    double* group = weierstrassGroup(a, b, min_x, max_x, n, N, threads);
 
     cout << "Weierstrass Group:" << endl;
     cout << group[0] << " points generated." << endl;
@@ -0,0 +1,288 @@
+// Weierstrass evaluation kernels shared by Weierstrass.cpp (executable) and _Weierstrass.cpp (library)
+#ifndef WEIERSTRASS_KERNEL_HPP
+#define WEIERSTRASS_KERNEL_HPP
+
+#include <algorithm>
+#include <cmath>
+#include <cstdint>
+#include <thread>
+#include <vector>
+
+#ifndef M_PI
+#define M_PI 3.14159265358979323846
+#endif
+
+// Smallest number of points worth giving to a thread of its own
+#define WEIERSTRASS_MIN_POINTS_PER_THREAD 4096
+// Number of points accumulated together by the term-major kernel (kept small enough to stay in L1)
+#define WEIERSTRASS_BLOCK_SIZE 1024
+// Default number of points between two exact cos anchors of the recurrence kernel
+#define WEIERSTRASS_RECURRENCE_ANCHOR 64
+
+// With glibc's libmvec (link with -lmvec) the compiler can vectorize cos and cosf:
+// 2 doubles (4 floats) per call with SSE2 and 4 doubles (8 floats) with AVX2
+#if defined(WEIERSTRASS_LIBMVEC) && defined(__GNUC__) && defined(__x86_64__) && defined(__GLIBC__)
+extern "C" __attribute__((simd("notinbranch"))) double cos(double) noexcept;
+extern "C" __attribute__((simd("notinbranch"))) float cosf(float) noexcept;
+#define WEIERSTRASS_AVX2 1
+#endif
+
+#ifdef __GNUC__
+#define WEIERSTRASS_ALWAYS_INLINE __attribute__((always_inline)) inline
+#else
+#define WEIERSTRASS_ALWAYS_INLINE inline
+#endif
+
+// a^i and b^i * pi for i = 0..n, computed once per group instead of once per point
+struct WeierstrassTerms {
+  std::vector<double> amplitudes;
+  std::vector<double> frequencies;
+};
+
+inline WeierstrassTerms weierstrassTerms(double a, double b, int n) {
+  WeierstrassTerms terms;
+  terms.amplitudes.resize(n + 1);
+  terms.frequencies.resize(n + 1);
+  for (int i = 0; i <= n; i++) {
+    terms.amplitudes[i] = pow(a, i);
+    terms.frequencies[i] = pow(b, i) * M_PI;
+  }
+  return terms;
+}
+
+inline double weierstrassAt(const WeierstrassTerms& terms, double x) {
+  double y = 0.0;
+  std::size_t count = terms.amplitudes.size();
+  for (std::size_t i = 0; i < count; i++) {
+    y += terms.amplitudes[i] * cos(terms.frequencies[i] * x);
+  }
+  return y;
+}
+
+// Term-major kernel: for each term, streams over the contiguous x values and accumulates into y
+// (y[i] = sum_t amplitudes[t] * cos(frequencies[t] * x[i]), the inner loop is laid out for auto-vectorization)
+typedef void (*WeierstrassKernel)(const double* amplitudes, const double* frequencies, int terms, const double* x, double* y, int count);
+
+WEIERSTRASS_ALWAYS_INLINE void weierstrassTermMajor(const double* amplitudes, const double* frequencies, int terms, const double* x, double* y, int count) {
+  for (int i = 0; i < count; i++) y[i] = 0.0;
+  for (int t = 0; t < terms; t++) {
+    const double amplitude = amplitudes[t];
+    const double frequency = frequencies[t];
+    #pragma omp simd
+    for (int i = 0; i < count; i++) {
+      y[i] += amplitude * cos(frequency * x[i]);
+    }
+  }
+}
+
+// Same kernel in float: half the bytes per point and twice the points per vector register.
+// The terms are given in cycles per unit of x (b^i / 2) and reduced to the nearest whole cycle before cosf,
+// which keeps cosf on its fast path (its large argument path is scalar).
+typedef void (*WeierstrassFloatKernel)(const float* amplitudes, const float* cycles, int terms, const float* x, float* y, int count);
+
+WEIERSTRASS_ALWAYS_INLINE void weierstrassTermMajorFloat(const float* amplitudes, const float* cycles, int terms, const float* x, float* y, int count) {
+  const float two_pi = static_cast<float>(2.0 * M_PI);
+  for (int i = 0; i < count; i++) y[i] = 0.0f;
+  for (int t = 0; t < terms; t++) {
+    const float amplitude = amplitudes[t];
+    const float cycle = cycles[t];
+    #pragma omp simd
+    for (int i = 0; i < count; i++) {
+      float turns = cycle * x[i];
+      y[i] += amplitude * cosf(two_pi * (turns - rintf(turns)));
+    }
+  }
+}
+
+inline void weierstrassTermMajorScalar(const double* amplitudes, const double* frequencies, int terms, const double* x, double* y, int count) {
+  weierstrassTermMajor(amplitudes, frequencies, terms, x, y, count);
+}
+
+inline void weierstrassTermMajorFloatScalar(const float* amplitudes, const float* cycles, int terms, const float* x, float* y, int count) {
+  weierstrassTermMajorFloat(amplitudes, cycles, terms, x, y, count);
+}
+
+#ifdef WEIERSTRASS_AVX2
+__attribute__((target("avx2,fma"))) inline void weierstrassTermMajorAvx2(const double* amplitudes, const double* frequencies, int terms, const double* x, double* y, int count) {
+  weierstrassTermMajor(amplitudes, frequencies, terms, x, y, count);
+}
+
+__attribute__((target("avx2,fma"))) inline void weierstrassTermMajorFloatAvx2(const float* amplitudes, const float* cycles, int terms, const float* x, float* y, int count) {
+  weierstrassTermMajorFloat(amplitudes, cycles, terms, x, y, count);
+}
+#endif
+
+struct WeierstrassKernelChoice {
+  const char* name;
+  WeierstrassKernel kernel;
+  WeierstrassFloatKernel float_kernel;
+};
+
+inline WeierstrassKernelChoice weierstrassDetectKernel() {
+#ifdef WEIERSTRASS_AVX2
+  __builtin_cpu_init();
+  if (__builtin_cpu_supports("avx2") && __builtin_cpu_supports("fma")) return {"avx2", weierstrassTermMajorAvx2, weierstrassTermMajorFloatAvx2};
+  return {"sse2", weierstrassTermMajorScalar, weierstrassTermMajorFloatScalar};
+#else
+  return {"scalar", weierstrassTermMajorScalar, weierstrassTermMajorFloatScalar};
+#endif
+}
+
+// Fastest kernel supported by the current CPU, detected once at runtime
+inline const WeierstrassKernelChoice& weierstrassSelectKernel() {
+  static const WeierstrassKernelChoice choice = weierstrassDetectKernel();
+  return choice;
+}
+
+// Fills the points [begin, end) of the grid min_x + i * step, block by block with the term-major kernel
+inline void weierstrassGroupRange(const WeierstrassTerms& terms, double min_x, double step, int begin, int end, double* x_out, double* y_out) {
+  WeierstrassKernel kernel = weierstrassSelectKernel().kernel;
+  int count_terms = static_cast<int>(terms.amplitudes.size());
+
+  for (int i = begin; i < end; i++) x_out[i] = min_x + i * step;
+  for (int start = begin; start < end; start += WEIERSTRASS_BLOCK_SIZE) {
+    int count = std::min(WEIERSTRASS_BLOCK_SIZE, end - start);
+    kernel(terms.amplitudes.data(), terms.frequencies.data(), count_terms, x_out + start, y_out + start, count);
+  }
+}
+
+// Number of threads used for count points: threads <= 0 means one per hardware thread
+inline int weierstrassThreadCount(int threads, int count) {
+  if (threads <= 0) threads = std::max(1u, std::thread::hardware_concurrency());
+  int useful = std::max(1, count / WEIERSTRASS_MIN_POINTS_PER_THREAD);
+  return std::max(1, std::min(threads, useful));
+}
+
+// Calls range(start, stop) on contiguous chunks of [begin, end), one thread per chunk
+template <typename Range>
+inline void weierstrassSplitRange(int begin, int end, int threads, Range range) {
+  threads = weierstrassThreadCount(threads, end - begin);
+
+  if (threads == 1) {
+    range(begin, end);
+    return;
+  }
+
+  std::vector<std::thread> workers;
+  int chunk = (end - begin + threads - 1) / threads;
+  for (int start = begin; start < end; start += chunk) {
+    int stop = std::min(end, start + chunk);
+    workers.emplace_back(range, start, stop);
+  }
+  for (std::thread& worker : workers) worker.join();
+}
+
+// Fills the points [begin, end) of the grid min_x + i * step split in contiguous chunks across threads
+inline void weierstrassRangeParallel(const WeierstrassTerms& terms, double min_x, double step, int begin, int end, double* x_out, double* y_out, int threads) {
+  weierstrassSplitRange(begin, end, threads, [&](int start, int stop) {
+    weierstrassGroupRange(terms, min_x, step, start, stop, x_out, y_out);
+  });
+}
+
+// Recurrence kernel: along the grid every term satisfies cos((k + 1) * theta) = 2 cos(theta) cos(k * theta) - cos((k - 1) * theta)
+// with theta = b^i * pi * step, so each point costs one multiply-add per term instead of a cos call.
+// The two first points of every run of anchor points are exact cos values, which bounds the drift.
+inline void weierstrassRecurrenceRange(const WeierstrassTerms& terms, double min_x, double step, int begin, int end, double* x_out, double* y_out, int anchor) {
+  int count_terms = static_cast<int>(terms.amplitudes.size());
+  const double* amplitudes = terms.amplitudes.data();
+  const double* frequencies = terms.frequencies.data();
+  std::vector<double> two_cos(count_terms), previous(count_terms), current(count_terms);
+  for (int t = 0; t < count_terms; t++) two_cos[t] = 2.0 * cos(frequencies[t] * step);
+  if (anchor < 2) anchor = 2;
+
+  for (int i = begin; i < end; i++) x_out[i] = min_x + i * step;
+  for (int start = begin; start < end; start += anchor) {
+    int stop = std::min(end, start + anchor);
+    double y_first = 0.0, y_second = 0.0;
+    for (int t = 0; t < count_terms; t++) {
+      previous[t] = cos(frequencies[t] * x_out[start]);
+      current[t] = cos(frequencies[t] * (x_out[start] + step));
+      y_first += amplitudes[t] * previous[t];
+      y_second += amplitudes[t] * current[t];
+    }
+    y_out[start] = y_first;
+    if (start + 1 < stop) y_out[start + 1] = y_second;
+
+    for (int k = start + 2; k < stop; k++) {
+      double y = 0.0;
+      #pragma omp simd reduction(+:y)
+      for (int t = 0; t < count_terms; t++) {
+        double next = two_cos[t] * current[t] - previous[t];
+        previous[t] = current[t];
+        current[t] = next;
+        y += amplitudes[t] * next;
+      }
+      y_out[k] = y;
+    }
+  }
+}
+
+// Fills the N + 1 points of [min_x, max_x] with the recurrence kernel, the x range split in contiguous chunks across threads
+inline void weierstrassGroupRecurrence(double a, double b, double min_x, double max_x, int n, int N, double* x_out, double* y_out, int threads, int anchor) {
+  WeierstrassTerms terms = weierstrassTerms(a, b, n);
+  double step = (max_x - min_x) / N;
+  weierstrassSplitRange(0, N + 1, threads, [&](int start, int stop) {
+    weierstrassRecurrenceRange(terms, min_x, step, start, stop, x_out, y_out, anchor);
+  });
+}
+
+// Deep zoom kernel: the phase of term t at point k is starts[t] + k * increments[t] in uint64 fixed point (2^63 stands for 1),
+// so the wrap around of the unsigned arithmetic is an exact reduction of b^t * x modulo 2 and cos only sees [-pi, pi).
+// The phases are prepared with exact integer arithmetic by weierstrassEngine.deepPhases.
+inline void weierstrassDeepRange(const double* amplitudes, const uint64_t* starts, const uint64_t* increments, int terms, int begin, int end, double* y_out) {
+  const double scale = M_PI / 9223372036854775808.0; // pi / 2^63
+  double angles[WEIERSTRASS_BLOCK_SIZE];
+
+  for (int start = begin; start < end; start += WEIERSTRASS_BLOCK_SIZE) {
+    int count = std::min(WEIERSTRASS_BLOCK_SIZE, end - start);
+    double* y = y_out + start;
+    for (int i = 0; i < count; i++) y[i] = 0.0;
+    for (int t = 0; t < terms; t++) {
+      const double amplitude = amplitudes[t];
+      const uint64_t increment = increments[t];
+      uint64_t phase = starts[t] + static_cast<uint64_t>(start) * increment;
+      for (int i = 0; i < count; i++) {
+        angles[i] = static_cast<double>(static_cast<int64_t>(phase)) * scale;
+        phase += increment;
+      }
+      #pragma omp simd
+      for (int i = 0; i < count; i++) {
+        y[i] += amplitude * cos(angles[i]);
+      }
+    }
+  }
+}
+
+// Fills the N + 1 values of the deep zoom kernel with the points split in contiguous chunks across threads
+inline void weierstrassGroupDeep(const double* amplitudes, const uint64_t* starts, const uint64_t* increments, int n, int N, double* y_out, int threads) {
+  weierstrassSplitRange(0, N + 1, threads, [&](int start, int stop) {
+    weierstrassDeepRange(amplitudes, starts, increments, n + 1, start, stop, y_out);
+  });
+}
+
+// Fills the N + 1 points of [min_x, max_x] in float with the float term-major kernel, the x range split across threads.
+// The grid and the coefficients are computed in double and rounded once.
+inline void weierstrassGroupFloat(double a, double b, double min_x, double max_x, int n, int N, float* x_out, float* y_out, int threads) {
+  WeierstrassTerms terms = weierstrassTerms(a, b, n);
+  std::vector<float> amplitudes(terms.amplitudes.begin(), terms.amplitudes.end());
+  std::vector<float> cycles(n + 1);
+  for (int i = 0; i <= n; i++) cycles[i] = static_cast<float>(terms.frequencies[i] / (2.0 * M_PI));
+  WeierstrassFloatKernel kernel = weierstrassSelectKernel().float_kernel;
+  double step = (max_x - min_x) / N;
+
+  weierstrassSplitRange(0, N + 1, threads, [&](int begin, int end) {
+    for (int i = begin; i < end; i++) x_out[i] = static_cast<float>(min_x + i * step);
+    for (int start = begin; start < end; start += WEIERSTRASS_BLOCK_SIZE) {
+      int count = std::min(WEIERSTRASS_BLOCK_SIZE, end - start);
+      kernel(amplitudes.data(), cycles.data(), n + 1, x_out + start, y_out + start, count);
+    }
+  });
+}
+
+// Fills the N + 1 points of [min_x, max_x] with the x range split in contiguous chunks across threads
+inline void weierstrassGroupParallel(double a, double b, double min_x, double max_x, int n, int N, double* x_out, double* y_out, int threads) {
+  WeierstrassTerms terms = weierstrassTerms(a, b, n);
+  weierstrassRangeParallel(terms, min_x, (max_x - min_x) / N, 0, N + 1, x_out, y_out, threads);
+}
+
+#endif
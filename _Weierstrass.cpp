@@ -1,6 +1,7 @@
 #include <iostream>
 #include <random>
 #include <math.h>
+#include "WeierstrassKernel.hpp"
 
 #ifndef M_PI
 #define M_PI 3.14159265358979323846
@@ -15,10 +16,18 @@ int next_odd(int value);
 // Function to generate a valid odd b within range
 int random_valid_b(int min_b, int max_b, std::mt19937 mt);
 
-// Export macro for DLL functions
+// Export macro for DLL (Windows) and shared library (Linux) functions
 #ifndef EXPORT
-#define EXPORT __declspec(dllexport)  
+#ifdef _WIN32
+#define EXPORT __declspec(dllexport)
+#else
+#define EXPORT __attribute__((visibility("default")))
 #endif
+#endif
+
+// Error codes returned by the buffer based functions
+#define WEIERSTRASS_ERR_ARGS -1 // invalid a, b, range, n or N
+#define WEIERSTRASS_ERR_BUFFER -2 // missing output buffer or wrong buffer length
 
 // Function to generate random a and b values
 extern "C" EXPORT double* random_a_b(double* a_p = nullptr, int* b_p = nullptr, int *range_p = nullptr);
@@ -32,6 +41,25 @@ extern "C" EXPORT double* weierstrassGroup(double a, double b, double min_x, dou
 // Function to free the dynamically allocated double pointer
 // This function should be called to avoid memory leaks
 extern "C" EXPORT void freeDblPointer(double* arr);
+// Number of points written by weierstrassGroup_into for N, or WEIERSTRASS_ERR_ARGS if N <= 0
+extern "C" EXPORT int weierstrassGroupLength(int N);
+// Weierstrass group function writing into caller owned buffers:
+// x_out and y_out must both hold exactly out_len = weierstrassGroupLength(N) doubles.
+// Generates N + 1 points in the range [min_x, max_x], both ends included.
+// Returns the number of points written or a negative error code.
+extern "C" EXPORT int weierstrassGroup_into(double a, double b, double min_x, double max_x, int n, int N, double* x_out, double* y_out, int out_len);
+// Same as weierstrassGroup_into with the x range split across threads (threads <= 0: one per hardware thread)
+extern "C" EXPORT int weierstrassGroupParallel_into(double a, double b, double min_x, double max_x, int n, int N, double* x_out, double* y_out, int out_len, int threads);
+// Same as weierstrassGroupParallel_into computed with the trig-free recurrence kernel,
+// re-anchored with exact cos values every anchor points (anchor <= 0: WEIERSTRASS_RECURRENCE_ANCHOR)
+extern "C" EXPORT int weierstrassGroupRecurrence_into(double a, double b, double min_x, double max_x, int n, int N, double* x_out, double* y_out, int out_len, int threads, int anchor);
+// Deep zoom evaluation: y_out[k] = sum_{i=0}^{n} amplitudes[i] * cos(pi * (starts[i] + k * increments[i]) / 2^63), k = 0..N,
+// the uint64 phases wrapping modulo 2 (see weierstrassDeepRange). y_out must hold exactly out_len = weierstrassGroupLength(N) doubles.
+extern "C" EXPORT int weierstrassGroupDeep_into(const double* amplitudes, const uint64_t* starts, const uint64_t* increments, int n, int N, double* y_out, int out_len, int threads);
+// Same as weierstrassGroupParallel_into in float: x_out and y_out hold exactly out_len = weierstrassGroupLength(N) floats
+extern "C" EXPORT int weierstrassGroupFloat_into(double a, double b, double min_x, double max_x, int n, int N, float* x_out, float* y_out, int out_len, int threads);
+// Name of the evaluation kernel picked for the current CPU: "avx2", "sse2" or "scalar"
+extern "C" EXPORT const char* weierstrassKernelName();
 
 // Function to generate a random double between min and max
 double random_double(double min, double max, std::mt19937 mt) {
@@ -92,8 +120,8 @@ extern "C" {
 
   double weierstrass(double a, double b, double x, int n) {
     double y = 0;
-    for (std::size_t i = 0; i <= n; i++){
-      y += pow(a, n) * cos(pow(b, n) * M_PI * x);
+    for (int i = 0; i <= n; i++){
+      y += pow(a, i) * cos(pow(b, i) * M_PI * x);
     }
 
     return y;
@@ -116,4 +144,54 @@ extern "C" {
   void freeDblPointer(double* arr) {
     delete [] arr;
   }
+
+  int weierstrassGroupLength(int N) {
+    if (N <= 0) return WEIERSTRASS_ERR_ARGS;
+    return N + 1;
+  }
+
+  int weierstrassGroup_into(double a, double b, double min_x, double max_x, int n, int N, double* x_out, double* y_out, int out_len) {
+    return weierstrassGroupParallel_into(a, b, min_x, max_x, n, N, x_out, y_out, out_len, 1);
+  }
+
+  int weierstrassGroupParallel_into(double a, double b, double min_x, double max_x, int n, int N, double* x_out, double* y_out, int out_len, int threads) {
+    if (N <= 0 || n < 0 || min_x >= max_x) return WEIERSTRASS_ERR_ARGS;
+    if (x_out == nullptr || y_out == nullptr) return WEIERSTRASS_ERR_BUFFER;
+    if (out_len != weierstrassGroupLength(N)) return WEIERSTRASS_ERR_BUFFER;
+
+    weierstrassGroupParallel(a, b, min_x, max_x, n, N, x_out, y_out, threads);
+    return out_len;
+  }
+
+  int weierstrassGroupRecurrence_into(double a, double b, double min_x, double max_x, int n, int N, double* x_out, double* y_out, int out_len, int threads, int anchor) {
+    if (N <= 0 || n < 0 || min_x >= max_x) return WEIERSTRASS_ERR_ARGS;
+    if (x_out == nullptr || y_out == nullptr) return WEIERSTRASS_ERR_BUFFER;
+    if (out_len != weierstrassGroupLength(N)) return WEIERSTRASS_ERR_BUFFER;
+    if (anchor <= 0) anchor = WEIERSTRASS_RECURRENCE_ANCHOR;
+
+    weierstrassGroupRecurrence(a, b, min_x, max_x, n, N, x_out, y_out, threads, anchor);
+    return out_len;
+  }
+
+  int weierstrassGroupDeep_into(const double* amplitudes, const uint64_t* starts, const uint64_t* increments, int n, int N, double* y_out, int out_len, int threads) {
+    if (N <= 0 || n < 0) return WEIERSTRASS_ERR_ARGS;
+    if (amplitudes == nullptr || starts == nullptr || increments == nullptr) return WEIERSTRASS_ERR_ARGS;
+    if (y_out == nullptr || out_len != weierstrassGroupLength(N)) return WEIERSTRASS_ERR_BUFFER;
+
+    weierstrassGroupDeep(amplitudes, starts, increments, n, N, y_out, threads);
+    return out_len;
+  }
+
+  int weierstrassGroupFloat_into(double a, double b, double min_x, double max_x, int n, int N, float* x_out, float* y_out, int out_len, int threads) {
+    if (N <= 0 || n < 0 || min_x >= max_x) return WEIERSTRASS_ERR_ARGS;
+    if (x_out == nullptr || y_out == nullptr) return WEIERSTRASS_ERR_BUFFER;
+    if (out_len != weierstrassGroupLength(N)) return WEIERSTRASS_ERR_BUFFER;
+
+    weierstrassGroupFloat(a, b, min_x, max_x, n, N, x_out, y_out, threads);
+    return out_len;
+  }
+
+  const char* weierstrassKernelName() {
+    return weierstrassSelectKernel().name;
+  }
 }
\ No newline at end of file
@@ -0,0 +1,107 @@
+"""
+Bounded pool of persistent compute workers (see computeWorker.py) evaluating many functions at once.
+
+Every worker holds at most one request, the other tasks wait in a priority queue so the functions
+visible in the viewport are computed first. A task still waiting in the queue can be cancelled.
+The pool never blocks: results are collected with poll() from the Tk thread.
+"""
+import heapq
+import os
+from computeWorker import ComputeWorker
+
+# Lower values are dispatched first
+PRIORITY_VISIBLE = 0
+PRIORITY_HIDDEN = 1
+
+
+def defaultSize():
+  return max(1, os.cpu_count() or 1)
+
+class ComputePool():
+  def __init__(self, function_name: str, size: int = 0, idle_timeout: float = 60.0):
+    self.function_name = function_name
+    self.idle_timeout = idle_timeout
+    self.size = size if size > 0 else defaultSize() # Compute Number setting, 0 means one worker per CPU
+    self.workers: list[ComputeWorker] = []
+    self.busy: dict[ComputeWorker, tuple[int, int]] = {} # {worker: (request_id, task_id)}
+    self.queue: list[tuple[int, int]] = [] # Heap of (priority, task_id), cancelled tasks are skipped when popped
+    self.tasks: dict[int, dict] = {} # {task_id: params} of the queued tasks
+    self.next_id = 0
+
+  def resize(self, size: int):
+    self.size = size if size > 0 else defaultSize()
+    self.trim()
+    self.dispatch()
+
+  def trim(self):
+    # Idle workers above the size are stopped, busy ones once their request is answered
+    for worker in list(self.workers):
+      if len(self.workers) <= self.size: break
+      if worker not in self.busy:
+        worker.stop()
+        self.workers.remove(worker)
+
+  def threadsPerWorker(self):
+    # The native kernel would otherwise start one thread per CPU in every worker
+    return max(1, defaultSize() // self.size)
+
+  def submit(self, params: dict, priority: int = PRIORITY_HIDDEN):
+    """
+    Queues a parameter set, returns its task id
+    """
+    task_id = self.next_id
+    self.next_id += 1
+    self.tasks[task_id] = params
+    heapq.heappush(self.queue, (priority, task_id))
+    self.dispatch()
+    return task_id
+
+  def cancel(self, task_id: int):
+    """
+    Returns True when the task was still queued and will not run
+    """
+    return self.tasks.pop(task_id, None) is not None
+
+  def idleWorker(self):
+    for worker in self.workers:
+      if worker not in self.busy: return worker
+    if len(self.workers) < self.size:
+      worker = ComputeWorker(self.function_name, self.idle_timeout)
+      self.workers.append(worker)
+      return worker
+    return None
+
+  def dispatch(self):
+    while self.queue:
+      worker = self.idleWorker()
+      if worker is None: return
+      while self.queue:
+        _, task_id = heapq.heappop(self.queue)
+        params = self.tasks.pop(task_id, None)
+        if params is None: continue # Cancelled
+        request_id = worker.submit({**params, "threads": self.threadsPerWorker()})
+        self.busy[worker] = (request_id, task_id)
+        break
+
+  def poll(self):
+    """
+    Returns the results received so far as (task_id, x_values, y_values, error_message) tuples
+    and hands the queued tasks to the workers that became idle
+    """
+    results = []
+    for worker in list(self.busy):
+      for request_id, x_values, y_values, message in worker.poll():
+        if self.busy.get(worker, (None,))[0] != request_id: continue
+        _, task_id = self.busy.pop(worker)
+        results.append((task_id, x_values, y_values, message))
+    self.trim()
+    self.dispatch()
+    return results
+
+  def stop(self):
+    for worker in self.workers:
+      worker.stop()
+    self.workers = []
+    self.busy = {}
+    self.queue = []
+    self.tasks = {}
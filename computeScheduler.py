@@ -0,0 +1,92 @@
+"""
+Latest-wins scheduling of computations, keyed by function instance.
+
+Every submit for a key bumps its generation. A superseded computation is cancelled right away
+when it can be (an executable is killed); otherwise the new job waits until the running one is done,
+and only the newest waiting job is kept. Results of stale generations are discarded instead of drawn.
+"""
+from typing import Callable, Hashable
+
+
+class ComputeJob():
+  def __init__(self, key: Hashable, generation: int, start: Callable, cancel: Callable | None):
+    self.key = key
+    self.generation = generation
+    self.start = start # start(job), begins the computation
+    self.cancel = cancel # cancel(job) -> bool, aborts the running computation if it can
+    self.data = None # Backend state of the running computation (process, request id, ...)
+
+
+class ComputeScheduler():
+  def __init__(self):
+    self.generations: dict[Hashable, int] = {}
+    self.running: dict[Hashable, ComputeJob] = {}
+    self.waiting: dict[Hashable, ComputeJob] = {} # Coalesced: at most one job per key waits for the running one
+    self.submitted = 0
+    self.cancelled = 0 # Killed while running, or replaced before they started
+    self.completed = 0 # Finished as the latest generation, their results are drawn
+    self.discarded = 0 # Finished after being superseded, their results are dropped
+
+  def submit(self, key: Hashable, start: Callable, cancel: Callable | None = None):
+    generation = self.generations.get(key, 0) + 1
+    self.generations[key] = generation
+    job = ComputeJob(key, generation, start, cancel)
+    self.submitted += 1
+
+    running = self.running.get(key)
+    if running is not None:
+      if running.cancel is not None and running.cancel(running):
+        self.cancelled += 1
+        self.running.pop(key)
+      else:
+        if key in self.waiting: self.cancelled += 1
+        self.waiting[key] = job
+        return job
+
+    self.startJob(job)
+    return job
+
+  def startJob(self, job: ComputeJob):
+    self.running[job.key] = job
+    job.start(job)
+
+  def isRunning(self, job: ComputeJob):
+    return self.running.get(job.key) is job
+
+  def isCurrent(self, job: ComputeJob):
+    return self.generations.get(job.key) == job.generation
+
+  def complete(self, job: ComputeJob):
+    """
+    Marks a job as finished and starts the job waiting for the same key.
+    Returns True when the result of job is the latest one and should be drawn.
+    """
+    if self.isRunning(job): self.running.pop(job.key)
+    current = self.isCurrent(job)
+    if current: self.completed += 1
+    else: self.discarded += 1
+
+    waiting = self.waiting.pop(job.key, None)
+    if waiting is not None and job.key not in self.running: self.startJob(waiting)
+    return current
+
+  def forget(self, key: Hashable):
+    """
+    Cancels everything scheduled for key, e.g. when its function is removed
+    """
+    self.generations[key] = self.generations.get(key, 0) + 1
+    if self.waiting.pop(key, None) is not None: self.cancelled += 1
+    running = self.running.get(key)
+    if running is not None and running.cancel is not None and running.cancel(running):
+      self.running.pop(key)
+      self.cancelled += 1
+
+  def stats(self):
+    return {
+      "submitted": self.submitted,
+      "cancelled": self.cancelled,
+      "completed": self.completed,
+      "discarded": self.discarded,
+      "running": len(self.running),
+      "waiting": len(self.waiting),
+    }
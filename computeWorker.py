@@ -0,0 +1,243 @@
+"""
+Long-lived compute worker, started once per function type instead of one process per Run.
+
+Protocol over the worker's stdin/stdout, every frame is a 4 byte little-endian length followed by its payload:
+  request:  one JSON frame {"id": int, "params": {...}}
+  response: one JSON frame {"id": int, "status": "ok" | "error", "count": int, "message": str}
+            followed, when status is "ok", by one frame holding count float64 x values then count float64 y values
+
+Run as a script (python computeWorker.py <function name>) to start the worker side.
+"""
+import json
+import os
+import queue
+import struct
+import subprocess
+import sys
+import threading
+import time
+from typing import Callable
+import numpy as np
+import weierstrassEngine
+import weierstrassNative
+
+FRAME_HEADER = struct.Struct("<I")
+
+
+def weierstrassSamples(params: dict):
+  a, b, _ = weierstrassEngine.random_a_b(params["a"], params["b"], params["range"])
+  if weierstrassNative.isAvailable():
+    return weierstrassNative.weierstrassGroup(a, b, params["min_x"], params["max_x"], params["n"], params["N"], params.get("threads", 0))
+  return weierstrassEngine.weierstrassGroup(a, b, params["min_x"], params["max_x"], params["n"], params["N"])
+
+# Sample functions the worker can serve, keyed by GenericFunction.function_name
+ENGINES: dict[str, Callable] = {
+  "Weierstrass": weierstrassSamples,
+}
+
+
+def writeFrame(pipe, payload: bytes):
+  pipe.write(FRAME_HEADER.pack(len(payload)))
+  pipe.write(payload)
+
+def readExactly(pipe, size: int):
+  data = bytearray()
+  while len(data) < size:
+    chunk = pipe.read(size - len(data))
+    if not chunk: raise EOFError("The pipe was closed in the middle of a frame.")
+    data += chunk
+  return bytes(data)
+
+def readFrame(pipe):
+  """
+  Returns the payload of the next frame, or None when the pipe is closed between frames
+  """
+  header = pipe.read(FRAME_HEADER.size)
+  if not header: return None
+  if len(header) < FRAME_HEADER.size: header += readExactly(pipe, FRAME_HEADER.size - len(header))
+  (size,) = FRAME_HEADER.unpack(header)
+  return readExactly(pipe, size)
+
+
+def serve(function_name: str, idle_timeout: float):
+  """
+  Worker side: answers requests until stdin is closed or no request arrived for idle_timeout seconds
+  """
+  engine = ENGINES[function_name]
+  stdin = sys.stdin.buffer
+  stdout = sys.stdout.buffer
+  requests: queue.Queue[bytes | None] = queue.Queue()
+
+  def readRequests():
+    while True:
+      payload = readFrame(stdin)
+      requests.put(payload)
+      if payload is None: break
+  threading.Thread(target=readRequests, daemon=True).start()
+
+  while True:
+    try:
+      payload = requests.get(timeout=idle_timeout if idle_timeout > 0 else None)
+    except queue.Empty:
+      # Idle shutdown, the client restarts the worker on its next request.
+      # os._exit skips joining the reader thread, which is blocked on stdin.
+      stdout.flush()
+      os._exit(0)
+    if payload is None: break
+
+    request = json.loads(payload)
+    try:
+      x_values, y_values = engine(request["params"])
+      block = np.concatenate((x_values, y_values)).astype("<f8", copy=False)
+    except Exception as e:
+      writeFrame(stdout, json.dumps({"id": request["id"], "status": "error", "count": 0, "message": str(e)}).encode())
+    else:
+      writeFrame(stdout, json.dumps({"id": request["id"], "status": "ok", "count": len(x_values), "message": ""}).encode())
+      writeFrame(stdout, block.tobytes())
+    stdout.flush()
+
+
+class ComputeWorker():
+  """
+  Client side of a persistent worker process.
+  Requests are written to the worker's stdin, responses are read by a reader thread and collected with poll().
+  The worker is started on the first request and restarted when it crashed or shut itself down while idle.
+  """
+  def __init__(self, function_name: str, idle_timeout: float = 60.0, max_restarts: int = 3):
+    self.function_name = function_name
+    self.idle_timeout = idle_timeout
+    self.max_restarts = max_restarts # Restarts allowed for a single request before it is reported as failed
+    self.process: subprocess.Popen | None = None
+    self.responses: queue.Queue[tuple] = queue.Queue()
+    self.pending: dict[int, dict] = {} # {request_id: params}
+    self.attempts: dict[int, int] = {} # {request_id: number of workers that died with it}
+    self.next_id = 0
+    self.restarts = 0
+    self.lock = threading.Lock()
+
+  def isRunning(self):
+    return self.process is not None and self.process.poll() is None
+
+  def start(self):
+    script = os.path.abspath(__file__)
+    self.process = subprocess.Popen(
+      [sys.executable, script, self.function_name, "--idle-timeout", str(self.idle_timeout)],
+      stdin=subprocess.PIPE,
+      stdout=subprocess.PIPE,
+      bufsize=0
+    )
+    threading.Thread(target=self.readResponses, args=(self.process,), daemon=True).start()
+
+  def stop(self):
+    if self.process is None: return
+    try:
+      self.process.stdin.close() # The worker exits when its stdin is closed
+      self.process.wait(timeout=1)
+    except (OSError, subprocess.TimeoutExpired):
+      self.process.kill()
+    self.process = None
+
+  def submit(self, params: dict):
+    """
+    Sends a parameter set (a, b, range, n, min_x, max_x, N for Weierstrass), returns its request id
+    """
+    with self.lock:
+      request_id = self.next_id
+      self.next_id += 1
+      self.pending[request_id] = params
+      self.attempts[request_id] = 0
+    self.send(request_id, params)
+    return request_id
+
+  def send(self, request_id: int, params: dict):
+    payload = json.dumps({"id": request_id, "params": params}).encode()
+    with self.lock:
+      if not self.isRunning():
+        if self.process is not None: self.restarts += 1
+        self.start()
+      try:
+        writeFrame(self.process.stdin, payload)
+        return
+      except (BrokenPipeError, OSError):
+        pass # The worker died under the write, the reader thread resends the pending requests
+
+  def readResponses(self, process: subprocess.Popen):
+    # Reader thread of one worker process
+    try:
+      while True:
+        payload = readFrame(process.stdout)
+        if payload is None: break
+        response = json.loads(payload)
+        x_values = y_values = None
+        if response["status"] == "ok":
+          block = np.frombuffer(readFrame(process.stdout), dtype="<f8")
+          x_values, y_values = block[:response["count"]], block[response["count"]:]
+        with self.lock:
+          self.pending.pop(response["id"], None)
+          self.attempts.pop(response["id"], None)
+        self.responses.put((response["id"], x_values, y_values, response["message"]))
+    except (EOFError, OSError, ValueError):
+      pass
+    process.wait()
+    self.recover(process)
+
+  def recover(self, process: subprocess.Popen):
+    """
+    Resends the requests left unanswered by a worker that exited (crash or idle shutdown)
+    """
+    with self.lock:
+      if self.process is not process: return
+      retry: list[tuple[int, dict]] = []
+      for request_id, params in list(self.pending.items()):
+        self.attempts[request_id] += 1
+        if self.attempts[request_id] > self.max_restarts:
+          self.pending.pop(request_id)
+          self.attempts.pop(request_id)
+          self.responses.put((request_id, None, None, f"The {self.function_name} worker exited with code {process.returncode}."))
+        else: retry.append((request_id, params))
+    for request_id, params in retry:
+      self.send(request_id, params)
+
+  def poll(self):
+    """
+    Returns the responses received so far as (request_id, x_values, y_values, error_message) tuples,
+    x_values and y_values are None when the request failed
+    """
+    responses = []
+    while True:
+      try:
+        responses.append(self.responses.get_nowait())
+      except queue.Empty:
+        return responses
+
+  def request(self, params: dict, timeout: float | None = None):
+    """
+    Blocking round trip, returns (x_values, y_values)
+    """
+    request_id = self.submit(params)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    others = []
+    try:
+      while True:
+        remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+        response = self.responses.get(timeout=remaining)
+        if response[0] == request_id: break
+        others.append(response)
+    finally:
+      for other in others: self.responses.put(other) # Left for poll()
+
+    _, x_values, y_values, message = response
+    if x_values is None: raise RuntimeError(message)
+    return x_values, y_values
+
+
+def main():
+  import argparse
+  parser = argparse.ArgumentParser(description="Persistent compute worker, speaks length-prefixed frames over stdin/stdout.")
+  parser.add_argument("function_name", choices=sorted(ENGINES))
+  parser.add_argument("--idle-timeout", type=float, default=60.0, help="seconds without requests before the worker exits (0 disables)")
+  args = parser.parse_args()
+  serve(args.function_name, args.idle_timeout)
+
+if __name__ == "__main__":
+  main()
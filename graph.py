@@ -7,6 +7,21 @@ from usableScreenSize import get_usable_screen_size
 import uuid
 import math
 import subprocess
+import threading
+import queue
+from concurrent.futures import ThreadPoolExecutor, Future
+import numpy as np
+import weierstrassEngine
+import weierstrassNative
+from computeWorker import ComputeWorker
+from computeScheduler import ComputeScheduler, ComputeJob
+from computePool import ComputePool, PRIORITY_VISIBLE, PRIORITY_HIDDEN, defaultSize
+import tileCache
+from tileCache import TileCache
+from sampleStore import SampleStore
+import viewCoordinates
+from fractions import Fraction
+from tkinter import filedialog
 
 import os
 
@@ -35,6 +50,8 @@ class Graph():
     self.initial_mid_n = self.gui.mid_n
     self.objects_class = GraphObjects(self)
     self.view = GraphView(self)
+    self.prefetcher = GraphPrefetcher(self)
+    self.plane_view = ParameterPlaneView(self)
     self.controller = GraphController(self)
     self.executableHandler = GraphExecutableHandler(self)
 
@@ -255,6 +272,51 @@ class Line():
   def __del__(self):...
     # print(f"Object {self.type} with id {self.id} is about to be deleted")
 
+class FunctionLine(Line):
+  """
+  Line through function samples given in graph units, projected to screen points on every draw
+  so that it follows the current scale and translation
+  """
+  def __init__(self, graph: Graph, color = "blue", speed = 0.0):
+    super().__init__(graph, (0.0, 0.0), color, speed)
+    self.type = "FunctionLine"
+    self.shapes = []
+    self.x_values = np.empty(0) # Relative to origin_x
+    self.y_values = np.empty(0)
+    self.origin_x = Fraction(0)
+
+  def setData(self, x_values: np.ndarray, y_values: np.ndarray, origin_x: Fraction = Fraction(0)):
+    self.shape.clear()
+    self.x_values = x_values
+    self.y_values = y_values
+    self.origin_x = origin_x
+    return self
+
+  def setEnvelope(self, x_values: np.ndarray, lower: np.ndarray, upper: np.ndarray):
+    """
+    Draws a vertical span [lower, upper] per column, as one path running up a column and down the next
+    """
+    up = np.arange(len(x_values)) % 2 == 0
+    starts = np.where(up, lower, upper)
+    stops = np.where(up, upper, lower)
+    return self.setData(np.repeat(x_values, 2), np.column_stack((starts, stops)).ravel())
+
+  def project(self):
+    view = self.graph.view
+    model = self.graph.model
+    # Samples and translations stay small next to the origins, only the difference of the origins is exact arithmetic
+    shift_x = viewCoordinates.shift(self.origin_x, model.origin_x)
+    shift_y = viewCoordinates.shift(Fraction(0), model.origin_y)
+    p_x = (self.x_values + shift_x) * (view.min_x_point / model.scale_x) + model.t_x
+    p_y = (self.y_values + shift_y) * (view.min_y_point / model.scale_y) + model.t_y
+    self.shapes = list(zip(p_x.tolist(), p_y.tolist()))
+    if len(self.shapes) > 0: self.startPoint = self.shapes[0]
+    return self
+
+  def draw(self, t_x = 0.0, t_y = 0.0):
+    if self.show: self.project()
+    return super().draw(t_x, t_y)
+
 class GraphGUI():
   def __init__(self, graph: Graph):
     self.graph = graph
@@ -267,6 +329,19 @@ class GraphGUI():
     self.show_grid = tk.BooleanVar(value=True)
     self.compute_number_value = 0
     self.turtle_choice = tk.StringVar(value="None")
+    self.compute_backend = tk.StringVar(value="Engine")
+    self.viewport_sampling = tk.BooleanVar(value=False)
+    self.oversampling_value = 2.0
+    self.auto_terms = tk.BooleanVar(value=False)
+    self.term_tolerance_value = 0.5 # pixels
+    self.envelope_rendering = tk.BooleanVar(value=False)
+    self.animation_fps_value = 10.0
+    self.plane_view_enabled = tk.BooleanVar(value=False)
+    self.float32_enabled = tk.BooleanVar(value=False)
+    self.float32_budget_value = weierstrassEngine.FLOAT32_ERROR_BUDGET
+    self.tile_cache_enabled = tk.BooleanVar(value=True)
+    self.disk_cache_enabled = tk.BooleanVar(value=False)
+    self.cosine_cache_enabled = tk.BooleanVar(value=False)
     self.half_grid_number_value = 20
     self.grid_number_value = self.half_grid_number_value * 2 + 1
     self.callables: list[Callable] = []
@@ -303,6 +378,51 @@ class GraphGUI():
     self.compute_number_edit = self.compute_number.add_command(label="Edit", command=self.editComputeNumber)
     self.compute_number_view = self.compute_number.add_command(label="View", command=self.viewComputeNumber)
 
+    self.compute_backend_menu = self.addCascade(self.settings_menu, "Compute Backend")
+    self.compute_backend_menu.add_radiobutton(label="Engine (in process)", variable=self.compute_backend, value="Engine")
+    self.compute_backend_menu.add_radiobutton(label="Worker (persistent process)", variable=self.compute_backend, value="Worker")
+    self.compute_backend_menu.add_radiobutton(label="Pool (Compute Number processes)", variable=self.compute_backend, value="Pool")
+    self.compute_backend_menu.add_radiobutton(label="Executable", variable=self.compute_backend, value="Executable")
+
+    self.sampling_menu = self.addCascade(self.settings_menu, "Sampling")
+    self.sampling_menu.add_checkbutton(label="Fit samples to viewport", variable=self.viewport_sampling, command=self.checkViewportSampling)
+    self.sampling_menu.add_command(label="Set oversampling factor", command=self.setOversampling)
+    self.sampling_menu.add_checkbutton(label="Automatic number of terms", variable=self.auto_terms)
+    self.sampling_menu.add_command(label="Set term tolerance", command=self.setTermTolerance)
+    self.sampling_menu.add_checkbutton(label="Render pixel envelopes (Engine backend)", variable=self.envelope_rendering)
+
+    self.plane_menu = self.addCascade(self.settings_menu, "Parameter Plane (x, a)")
+    self.plane_menu.add_checkbutton(label="Show W over the (x, a) plane", variable=self.plane_view_enabled, command=self.checkPlaneView)
+    self.plane_menu.add_command(label="Set b", command=self.setPlaneB)
+    self.plane_menu.add_command(label="Set n", command=self.setPlaneN)
+
+    self.precision_menu = self.addCascade(self.settings_menu, "Precision")
+    self.precision_menu.add_checkbutton(label="Float32 fast path (Engine backend)", variable=self.float32_enabled)
+    self.precision_menu.add_command(label="Set float32 error budget", command=self.setFloat32Budget)
+    self.precision_menu.add_command(label="View modes used", command=self.viewPrecisionModes)
+
+    self.tile_cache_menu = self.addCascade(self.settings_menu, "Tile Cache")
+    self.tile_cache_menu.add_checkbutton(label="Use tile cache (Engine backend)", variable=self.tile_cache_enabled, command=self.updateMenuBar)
+    self.tile_cache_menu.add_command(label="Set memory budget", command=self.setTileCacheBudget)
+    self.tile_cache_menu.add_command(label="View statistics", command=self.viewTileCacheStatistics)
+    self.tile_cache_menu.add_command(label="Clear", command=self.clearTileCache)
+
+    self.cosine_cache_menu = self.addCascade(self.settings_menu, "Cosine Row Cache")
+    self.cosine_cache_menu.add_checkbutton(label="Use cosine row cache (Engine backend)", variable=self.cosine_cache_enabled)
+    self.cosine_cache_menu.add_command(label="Set memory budget", command=self.setCosineCacheBudget)
+    self.cosine_cache_menu.add_command(label="View memory usage", command=self.viewCosineCacheStatistics)
+    self.cosine_cache_menu.add_command(label="Clear", command=weierstrassEngine.COSINE_ROWS.clear)
+
+    self.disk_cache_menu = self.addCascade(self.settings_menu, "Disk Cache")
+    # Tiled samples never reach the store, so the disk cache only applies with the tile cache off
+    disk_cache_state = "disabled" if self.tile_cache_enabled.get() else "normal"
+    self.disk_cache_menu.add_checkbutton(label="Use disk cache (Engine backend, tile cache off)", variable=self.disk_cache_enabled, state=disk_cache_state)
+    self.disk_cache_menu.add_command(label="Set directory", command=self.setDiskCacheDirectory)
+    self.disk_cache_menu.add_command(label="Set size cap", command=self.setDiskCacheSize)
+    self.disk_cache_menu.add_command(label="View statistics", command=self.viewDiskCacheStatistics)
+
+    self.settings_menu.add_command(label="Set animation frame rate", command=self.setAnimationFps)
+    self.settings_menu.add_command(label="View compute statistics", command=self.viewComputeStatistics)
     self.settings_menu.add_command(label="Set absolute X scale value", command=self.setAbsXScale)
     self.settings_menu.add_command(label="Set absolute Y scale value", command=self.setAbsYScale)
     self.settings_menu.add_command(label="Set absolute X translation value", command=self.setAbsXTrans)
@@ -323,11 +443,12 @@ class GraphGUI():
     for i in range(l):
       obj = self.graph.functions_list_objs[i]
       if i == 0:
+        self.active_functions_menu.add_command(label="Run All Active Functions", command=self.graph.executableHandler.runAll)
         self.active_functions_menu.add_command(label="Clear All Active Functions", command=obj.accessory.removeAllFunctions)
         self.active_functions_menu.add_command(label="Clear Selected Active Functions", command=obj.accessory.removeFunctions)
       obj.updateFunctionMenuBar()
 
-    self.addCascade(self.menu_bar, f"Zoom step: {self.zoom_step}  Scale: {round(self.graph.model.scale_x, 4)}, {round(self.graph.model.scale_x, 4)}  Translation: {round(self.graph.model.t_x, 4)}, {round(self.graph.model.t_y, 4)}")
+    self.addCascade(self.menu_bar, f"Zoom step: {self.zoom_step}  Scale: {round(self.graph.model.scale_x, 4)}, {round(self.graph.model.scale_x, 4)}  Translation: {round(self.graph.model.originPointX(), 4)}, {round(self.graph.model.originPointY(), 4)}")
 
   def addSeparators(self, n=1):
     for i in range(n):
@@ -357,18 +478,20 @@ class GraphGUI():
   def setAbsXTrans(self):
     tmp = simpledialog.askfloat(title="X translation value", prompt="Set absolute value for X translation")
     if tmp is not None:
-      self.graph.model.translateX(-self.graph.model.t_x + tmp)
+      self.graph.model.setOriginPointX(tmp)
 
   def setAbsYTrans(self):
     tmp = simpledialog.askfloat(title="Y translation value", prompt="Set absolute value for Y translation")
     if tmp is not None:
-      self.graph.model.translateY(-self.graph.model.t_y + tmp)
+      self.graph.model.setOriginPointY(tmp)
 
   def zoomIn(self):
+    self.graph.prefetcher.cancel()
     self.graph.model.setScaleX(self.graph.model.scale_x / self.zoom_step)
     self.graph.model.setScaleY(self.graph.model.scale_y / self.zoom_step)
 
   def zoomOut(self):
+    self.graph.prefetcher.cancel()
     self.graph.model.setScaleX(self.graph.model.scale_x * self.zoom_step)
     self.graph.model.setScaleY(self.graph.model.scale_y * self.zoom_step)
   
@@ -378,8 +501,8 @@ class GraphGUI():
   
 
   def center(self):
-    self.graph.model.translateX(-self.graph.model.t_x)
-    self.graph.model.translateY(-self.graph.model.t_y)
+    self.graph.model.setOriginPointX(0.0)
+    self.graph.model.setOriginPointY(0.0)
 
   def setZoomStep(self):
     tmp = simpledialog.askfloat(title="Zoom step", prompt="Set the zoom step value", initialvalue=self.zoom_step, minvalue=1)
@@ -411,11 +534,102 @@ class GraphGUI():
   
   def editComputeNumber(self):
     tmp = simpledialog.askinteger(title="Compute Number", prompt = "Input compute number", initialvalue=self.compute_number_value, minvalue = 0, parent=self.compute_number)
-    if tmp is not None: self.compute_number_value = tmp
+    if tmp is not None:
+      self.compute_number_value = tmp
+      self.graph.executableHandler.resizePools(tmp)
 
   def viewComputeNumber(self):
     messagebox.showinfo(title="Compute number value", message=f"The compute number value is {self.compute_number_value}")
 
+  def checkViewportSampling(self):
+    self.graph.controller.updateController()
+
+  def setOversampling(self):
+    tmp = simpledialog.askfloat(title="Oversampling factor", prompt="Samples per pixel of window width", initialvalue=self.oversampling_value, minvalue=0.1, maxvalue=64.0)
+    if tmp is not None:
+      self.oversampling_value = tmp
+      self.graph.controller.updateController()
+
+  def setTileCacheBudget(self):
+    tile_cache = self.graph.executableHandler.tile_cache
+    tmp = simpledialog.askinteger(title="Tile cache budget", prompt="Input the tile cache memory budget (MB)", initialvalue=tile_cache.budget >> 20, minvalue=0)
+    if tmp is not None: tile_cache.setBudget(tmp << 20)
+
+  def clearTileCache(self):
+    self.graph.executableHandler.tile_cache.clear()
+
+  def viewTileCacheStatistics(self):
+    stats = self.graph.executableHandler.tile_cache.stats()
+    stats["prefetches cancelled"] = self.graph.prefetcher.cancelled
+    message = "\n".join(f"{name.capitalize()}: {value}" for name, value in stats.items())
+    messagebox.showinfo(title="Tile cache statistics", message=message)
+
+  def setCosineCacheBudget(self):
+    cosine_rows = weierstrassEngine.COSINE_ROWS
+    tmp = simpledialog.askinteger(title="Cosine row cache budget", prompt="Input the cosine row cache memory budget (MB)", initialvalue=cosine_rows.budget >> 20, minvalue=0)
+    if tmp is not None: cosine_rows.setBudget(tmp << 20)
+
+  def viewCosineCacheStatistics(self):
+    stats = weierstrassEngine.COSINE_ROWS.stats()
+    message = "\n".join(f"{name.capitalize()}: {value}" for name, value in stats.items())
+    messagebox.showinfo(title="Cosine row cache", message=message)
+
+  def setDiskCacheDirectory(self):
+    sample_store = self.graph.executableHandler.sample_store
+    tmp = filedialog.askdirectory(title="Disk cache directory", initialdir=sample_store.directory, parent=self.root)
+    if tmp: sample_store.setDirectory(tmp)
+
+  def setDiskCacheSize(self):
+    sample_store = self.graph.executableHandler.sample_store
+    tmp = simpledialog.askinteger(title="Disk cache size", prompt="Input the disk cache size cap (MB)", initialvalue=sample_store.max_bytes >> 20, minvalue=0)
+    if tmp is not None: sample_store.setMaxBytes(tmp << 20)
+
+  def viewDiskCacheStatistics(self):
+    stats = self.graph.executableHandler.sample_store.stats()
+    message = "\n".join(f"{name.capitalize()}: {value}" for name, value in stats.items())
+    messagebox.showinfo(title="Disk cache statistics", message=message)
+
+  def setTermTolerance(self):
+    tmp = simpledialog.askfloat(title="Term tolerance", prompt="Largest error left by the dropped terms (pixels)", initialvalue=self.term_tolerance_value, minvalue=1e-6)
+    if tmp is not None: self.term_tolerance_value = tmp
+
+  def checkPlaneView(self):
+    if self.plane_view_enabled.get(): self.graph.plane_view.schedule()
+    else: self.graph.plane_view.hide()
+
+  def setPlaneB(self):
+    plane_view = self.graph.plane_view
+    tmp = simpledialog.askfloat(title="Parameter plane b", prompt="b of the (x, a) plane", initialvalue=plane_view.b_value)
+    if tmp is not None:
+      plane_view.b_value = tmp
+      plane_view.schedule()
+
+  def setPlaneN(self):
+    plane_view = self.graph.plane_view
+    tmp = simpledialog.askinteger(title="Parameter plane n", prompt="Number of terms of the (x, a) plane", initialvalue=plane_view.n_value, minvalue=0)
+    if tmp is not None:
+      plane_view.n_value = tmp
+      plane_view.schedule()
+
+  def setFloat32Budget(self):
+    tmp = simpledialog.askfloat(title="Float32 error budget", prompt="Error allowed relative to the largest |W|", initialvalue=self.float32_budget_value, minvalue=0.0, maxvalue=1.0)
+    if tmp is not None: self.float32_budget_value = tmp
+
+  def viewPrecisionModes(self):
+    modes = self.graph.executableHandler.precision_modes
+    message = "\n".join(f"{name.capitalize()}: {value}" for name, value in modes.items())
+    messagebox.showinfo(title="Precision modes", message=message)
+
+  def setAnimationFps(self):
+    tmp = simpledialog.askfloat(title="Animation frame rate", prompt="Partial sums shown per second", initialvalue=self.animation_fps_value, minvalue=0.1, maxvalue=120.0)
+    if tmp is not None: self.animation_fps_value = tmp
+
+  def viewComputeStatistics(self):
+    stats = self.graph.executableHandler.scheduler.stats()
+    stats.update(self.graph.executableHandler.envelope_stats)
+    message = "\n".join(f"{name.capitalize()}: {value}" for name, value in stats.items())
+    messagebox.showinfo(title="Compute statistics", message=message)
+
   def setTurtleToAddOnClick(self):...
 
   def printGeometry(self):
@@ -439,8 +653,10 @@ class GraphModel():
     self.max_unit_w = 60.0
     self.max_unit_w_p = 40.0
     self.max_unit_h_p = 0.0
-    self.t_x = 0.0
+    self.t_x = 0.0 # Pixels, relative to origin_x
     self.t_y = 0.0
+    self.origin_x = Fraction(0) # Exact view origin in graph units, see viewCoordinates
+    self.origin_y = Fraction(0)
     self.limit = 6
     self.mark_added_object_onclick = False
     self.graph.style.configure(
@@ -484,20 +700,26 @@ class GraphModel():
 
   def setScaleX(self, number:float):
     sgn = self.getSgn(number)
+    old_scale = self.scale_x
     if abs(self.scale_x) < 1:
       self.scale_x = sgn * max(abs(number), 1e-100)
     else:
       self.scale_x = sgn * min(abs(number), 1e100)
+    # Keep zooming around originPointX, not around the rebased origin
+    self.origin_x = viewCoordinates.rescale(self.origin_x, old_scale, self.scale_x, self.pixelsPerUnitX())
     
     if self.graph.gui:
       self.graph.gui.updateMenuBar()
 
   def setScaleY(self, number:float):
     sgn = self.getSgn(number)
+    old_scale = self.scale_y
     if abs(self.scale_y) < 1:
       self.scale_y = sgn * max(abs(number), 1e-100)
     else:
       self.scale_y = sgn * min(abs(number), 1e100)
+    # Keep zooming around originPointY, not around the rebased origin
+    self.origin_y = viewCoordinates.rescale(self.origin_y, old_scale, self.scale_y, self.pixelsPerUnitY())
 
     if self.graph.gui:
       self.graph.gui.updateMenuBar()
@@ -509,6 +731,7 @@ class GraphModel():
       self.t_x = sgn * max(abs(n_t_x), 1e-100)
     else:
       self.t_x = sgn * min(abs(n_t_x), 1e100)
+    self.origin_x, self.t_x = viewCoordinates.rebase(self.origin_x, self.t_x, self.pixelsPerUnitX())
 
     if self.graph.gui:
       self.graph.gui.updateMenuBar()
@@ -520,10 +743,36 @@ class GraphModel():
       self.t_y = sgn * max(abs(n_t_y), 1e-100)
     else:
       self.t_y = sgn * min(abs(n_t_y), 1e100)
+    self.origin_y, self.t_y = viewCoordinates.rebase(self.origin_y, self.t_y, self.pixelsPerUnitY())
 
     if self.graph.gui:
       self.graph.gui.updateMenuBar()
 
+  def pixelsPerUnitX(self):
+    view = getattr(self.graph, "view", None)
+    return view.min_x_point / self.scale_x if view is not None else 0.0
+
+  def pixelsPerUnitY(self):
+    view = getattr(self.graph, "view", None)
+    return view.min_y_point / self.scale_y if view is not None else 0.0
+
+  def originPointX(self):
+    """Screen x of x = 0 (pixels from the window centre), the translation before the origin was rebased."""
+    return self.t_x - float(self.origin_x) * self.pixelsPerUnitX()
+
+  def originPointY(self):
+    return self.t_y - float(self.origin_y) * self.pixelsPerUnitY()
+
+  def setOriginPointX(self, point: float):
+    self.origin_x = Fraction(0)
+    self.t_x = 0.0
+    self.translateX(point)
+
+  def setOriginPointY(self, point: float):
+    self.origin_y = Fraction(0)
+    self.t_y = 0.0
+    self.translateY(point)
+
   def getSgn(self, number: float):
     if number >= 0: return 1;
     else: return -1;
@@ -537,6 +786,8 @@ class GraphView():
     self.l_p_y = 0.0
     self.d_x = 0.0
     self.d_y = 0.0
+    self.v_x = 0.0 # Horizontal drag velocity (pixels per second), used to predict the next viewport
+    self.drag_time = 0.0
     self.updateMode: Literal["onmove"] | Literal["aftermove"] | None = "onmove"
     self.removeArtifacts()
 
@@ -562,17 +813,24 @@ class GraphView():
     return (top_left_x, top_left_y)
 
   def execScreenDragStart(self, event):
+    self.graph.prefetcher.cancel()
     p_x, p_y = self.windowTopLeftToCentered((event.x, event.y))
     self.l_p_x = p_x
     self.l_p_y = p_y
+    self.drag_time = time.monotonic()
+    self.v_x = 0.0
 
   def execScreenDragMotion(self, event):
     if self.updateMode is not None:
+      self.graph.prefetcher.cancel()
       p_x, p_y = self.windowTopLeftToCentered((event.x, event.y))
       d_x = p_x - self.l_p_x
       self.l_p_x = p_x
       d_y = p_y - self.l_p_y
       self.l_p_y = p_y
+      now = time.monotonic()
+      if now > self.drag_time: self.v_x = 0.5 * self.v_x + 0.5 * d_x / (now - self.drag_time) # Smoothed
+      self.drag_time = now
       
       if self.updateMode == "onmove":
         self.graph.model.translateX(d_x)
@@ -585,6 +843,7 @@ class GraphView():
 
 
   def execScreenDragEnd(self, _):
+    self.v_x = 0.0 # The view stops with the drag, later redraws must not extrapolate it
     if self.updateMode is not None and self.updateMode == "aftermove":
       self.graph.model.translateX(self.d_x)
       self.graph.model.translateY(self.d_y)
@@ -618,10 +877,50 @@ class GraphView():
   def getYFromYPoint(self, y_point: float):
     return (y_point / self.min_y_point) * self.graph.model.scale_y
 
+  def visibleXOffsets(self):
+    """Visible x interval relative to the model's origin_x."""
+    w, _ = self.graph.getWindowSize()
+    t_x = self.graph.model.t_x
+    x_0 = self.getXFromXPoint(-w/2 - t_x)
+    x_1 = self.getXFromXPoint(w/2 - t_x)
+    return min(x_0, x_1), max(x_0, x_1)
+
+  def visibleXRange(self):
+    min_x, max_x = self.visibleXOffsets()
+    origin_x = float(self.graph.model.origin_x)
+    return origin_x + min_x, origin_x + max_x
+
+  def viewportSampling(self):
+    """Returns (min_x, max_x, N, origin): the visible x interval and one sample per pixel of window width
+    times the oversampling factor, or None before the units are laid out.
+    The interval is relative to origin, which is zero unless float64 cannot resolve the samples (see viewCoordinates.foldOrigin)."""
+    if self.min_x_point == 0: return None
+    w, _ = self.graph.getWindowSize()
+    min_x, max_x = self.visibleXOffsets()
+    N = max(1, int(w * self.graph.gui.oversampling_value))
+    min_x, max_x, origin = viewCoordinates.foldOrigin(self.graph.model.origin_x, min_x, max_x, N)
+    return (min_x, max_x, N, origin)
+
+  def pixelWidth(self):
+    """Width of one pixel in x units, or None before the units are laid out."""
+    if self.min_x_point == 0: return None
+    return abs(self.getXFromXPoint(1))
+
+  def pixelHeight(self):
+    """Height of one pixel in y units, or None before the units are laid out."""
+    if self.min_y_point == 0: return None
+    return abs(self.getYFromYPoint(1))
+
+  def isVisible(self, helper: "HelperFunction"):
+    x_range = helper.getXRange()
+    if x_range is None or self.min_x_point == 0: return True
+    min_x, max_x = self.visibleXRange()
+    return x_range[0] <= max_x and x_range[1] >= min_x
+
   def updateAxes(self, obj, w:int, h: int):
     w_p = self.graph.model.p_pensize * 2
-    t_x = self.graph.model.t_x
-    t_y = self.graph.model.t_y
+    t_x = self.graph.model.originPointX()
+    t_y = self.graph.model.originPointY()
     
     if obj.name == "gridX":
       if self.graph.gui.show_axes.get():
@@ -861,16 +1160,16 @@ class GraphView():
     else: self.graph.model.max_unit_h_p = 0
 
     w_p = self.graph.model.p_pensize * 2
-    t_x = self.graph.model.t_x
-    t_y = self.graph.model.t_y
 
     self.min_x_point = ((self.graph.model.max_unit_w / 2) + self.graph.model.max_unit_w_p) 
+    self.min_y_point = ((font_height / 2) + self.graph.model.max_unit_h_p)
+    t_x = self.graph.model.originPointX()
+    t_y = self.graph.model.originPointY()
     interval_x = self.calcUnitInterval(self.graph.model.scale_x)
     interval_x_point = self.getXPointFromX(interval_x)
     min_x_i = (-w/2 + t_x) / interval_x_point
     max_x_i = (w/2 + t_x) / interval_x_point
 
-    self.min_y_point = ((font_height / 2) + self.graph.model.max_unit_h_p)
     interval_y = self.calcUnitInterval(self.graph.model.scale_y)
     interval_y_point = self.getYPointFromY(interval_y)
     min_y_i = (-h/2 + t_y) / interval_y_point
@@ -1075,6 +1374,8 @@ class GraphView():
         self.graph.writer.clear()
 
         self.graph.model.busy = False
+        self.graph.executableHandler.stopWorkers()
+        self.graph.executableHandler.sample_store.flush()
         self.graph.tt.bye()
 
 
@@ -1092,12 +1393,15 @@ class GraphController():
     self.graph.root.bind("<ButtonPress-1>", self.graph.onButtonPress)
     self.graph.root.bind("<ButtonRelease-1>", self.graph.onButtonRelease)
 
+    self.batching = False # Set while resampleToViewport runs the helpers, their redraws are deferred
+    self.redraw_pending = False
     self.graph.view.display()
     self.updateController()
     self.redraw_after_id = None
     self.graph.root.bind("<Configure>", lambda event: self.redraw(event))
 
   def redraw(self, _):
+    self.graph.prefetcher.cancel()
     # Cancel any pending delayed redraw calls
     if self.redraw_after_id is not None:
       self.graph.root.after_cancel(self.redraw_after_id)
@@ -1108,60 +1412,570 @@ class GraphController():
     self.updateController()
 
   def updateController(self):
+    if self.batching:
+      self.redraw_pending = True
+      return
     _, _ = self.graph.view.updateView()
+    self.resampleToViewport()
+    self.graph.prefetcher.schedule()
+    self.graph.plane_view.schedule()
+
+  def resampleToViewport(self):
+    # Recomputes the plotted functions whose visible interval or resolution changed
+    # All the helpers run first and the view is redrawn once, not once per function
+    if not self.graph.gui.viewport_sampling.get(): return
+    self.batching = True
+    try:
+      for helper in self.graph.functions_list_objs:
+        if helper.line is not None and helper.fitToViewport(): helper.run()
+    finally:
+      self.batching = False
+    if self.redraw_pending:
+      self.redraw_pending = False
+      self.graph.view.updateView()
+
+class GraphPrefetcher():
+  """Speculatively fills the tile cache while the Tk loop is idle.
+  The next viewports are predicted from the drag velocity, the neighbouring half screens and the zoom step.
+  Their missing tiles are computed a few at a time from after callbacks and dropped as soon as real input arrives."""
+  def __init__(self, graph: Graph):
+    self.graph = graph
+    self.lookahead = 0.25 # s of drag extrapolated
+    self.tiles_per_step = 2
+    self.step_interval = 1 # ms
+    self.after_id: str | None = None
+    self.pending: list[tuple] = [] # (key, group, self-similarity, level, index) of the tiles still to prefetch
+    self.cancelled = 0
+
+  def schedule(self):
+    self.cancel()
+    gui = self.graph.gui
+    if gui.viewport_sampling.get() and gui.tile_cache_enabled.get() and gui.compute_backend.get() == "Engine":
+      self.after_id = self.graph.root.after_idle(self.plan)
+
+  def cancel(self):
+    if self.after_id is not None:
+      self.graph.root.after_cancel(self.after_id)
+      self.after_id = None
+    self.cancelled += len(self.pending)
+    self.pending = []
+
+  def predictViewports(self):
+    view = self.graph.view
+    sampling = view.viewportSampling()
+    if sampling is None: return []
+    min_x, max_x, N, origin = sampling
+    if origin != 0: return [] # The tiles live on the absolute grid
+    viewports = []
+    shift = view.getXFromXPoint(view.v_x * self.lookahead) # Dragging right moves the visible interval left
+    if shift != 0.0: viewports.append((min_x - shift, max_x - shift, N))
+    half = (max_x - min_x) / 2
+    viewports.append((min_x - half, max_x - half, N))
+    viewports.append((min_x + half, max_x + half, N))
+    zoom_step = self.graph.gui.zoom_step
+    if zoom_step != 1:
+      viewports.append((min_x / zoom_step, max_x / zoom_step, N))
+      viewports.append((min_x * zoom_step, max_x * zoom_step, N))
+    return viewports
+
+  def plan(self):
+    self.after_id = None
+    handler = self.graph.executableHandler
+    for min_x, max_x, N in self.predictViewports():
+      for helper in self.graph.functions_list_objs:
+        request = handler.tile_requests.get(helper)
+        if request is None: continue
+        key, group, self_similarity = request
+        if self_similarity is None: missing = handler.tile_cache.missingTiles(key, min_x, max_x, N)
+        else: missing = handler.tile_cache.missingSelfSimilarTiles(key, self_similarity[1], min_x, max_x, N)
+        for level, index in missing:
+          self.pending.append((key, group, self_similarity, level, index))
+    if self.pending: self.after_id = self.graph.root.after(self.step_interval, self.step)
+
+  def step(self):
+    self.after_id = None
+    tile_cache = self.graph.executableHandler.tile_cache
+    for _ in range(self.tiles_per_step):
+      if not self.pending: return
+      key, group, self_similarity, level, index = self.pending.pop(0)
+      if self_similarity is None: tile_cache.prefetch(key, group, level, index)
+      else: tile_cache.prefetchSelfSimilar(key, *self_similarity, level, index)
+    if self.pending: self.after_id = self.graph.root.after(self.step_interval, self.step)
+
+class ParameterPlaneView():
+  """Heatmap of W(a, b, x) over the visible window: x along the horizontal axis and a along the vertical one
+  (the y axis of the graph), for a fixed b and n. One pixel per (x, a) sample, coloured by W / sum |a|^i,
+  blue for -1, white for 0 and red for 1.
+  The window is cut in tiles computed by a thread pool with weierstrassEngine.weierstrassSweep (the cosine rows of
+  a tile's columns are shared by all its rows) and copied into one PhotoImage as they complete, centre first.
+  A new view cancels the tiles not started yet and the results of the old view are dropped, an unchanged one is left alone."""
+  TILE_PIXELS = 256
+  POLL_INTERVAL = 15 # ms
+
+  def __init__(self, graph: Graph):
+    self.graph = graph
+    self.b_value = 3.0
+    self.n_value = 20
+    self.executor = ThreadPoolExecutor(max_workers=defaultSize())
+    self.futures: dict[Future, tuple[int, int]] = {} # {future: (left, top)} of the tiles of the current view
+    self.image: tk.PhotoImage | None = None
+    self.item: int | None = None # Canvas item showing image
+    self.schedule_id: str | None = None
+    self.poll_id: str | None = None
+    self.tiles_done = 0
+    self.view_key: tuple | None = None # (x range, a range, b, n, size) of the image
+    self.failed = False # A tile of the current view failed, reported once
+
+  def schedule(self):
+    # Coalesces the view changes of one Tk loop iteration into one refresh
+    if not self.graph.gui.plane_view_enabled.get() or self.schedule_id is not None: return
+    self.schedule_id = self.graph.root.after_idle(self.refresh)
+
+  def cancel(self):
+    for future in self.futures: future.cancel()
+    self.futures = {}
+    if self.poll_id is not None:
+      self.graph.root.after_cancel(self.poll_id)
+      self.poll_id = None
+
+  def hide(self):
+    self.cancel()
+    if self.schedule_id is not None:
+      self.graph.root.after_cancel(self.schedule_id)
+      self.schedule_id = None
+    if self.item is not None:
+      self.graph.screen.cv.delete(self.item)
+      self.item = None
+    self.image = None
+    self.view_key = None
+
+  def visibleSamples(self, w: int, h: int):
+    """Returns the x value of every pixel column and the a value of every pixel row (top row first), or None before the units are laid out."""
+    view = self.graph.view
+    model = self.graph.model
+    if view.min_x_point == 0 or view.min_y_point == 0: return None
+    columns = np.arange(w) - w / 2 + 0.5 - model.t_x
+    rows = h / 2 - 0.5 - np.arange(h) - model.t_y
+    x_values = float(model.origin_x) + columns * (model.scale_x / view.min_x_point)
+    a_values = float(model.origin_y) + rows * (model.scale_y / view.min_y_point)
+    return x_values, a_values
+
+  def refresh(self):
+    self.schedule_id = None
+    if not self.graph.gui.plane_view_enabled.get(): return
+    w, h = self.graph.getWindowSize()
+    samples = self.visibleSamples(w, h)
+    if samples is None: return
+    x_values, a_values = samples
+    # Animation frames and polls redraw the graph without moving the plane
+    view_key = (x_values[0], x_values[-1], a_values[0], a_values[-1], self.b_value, self.n_value, w, h)
+    if view_key == self.view_key: return
+    self.cancel()
+    self.view_key = view_key
+    self.failed = False
+
+    canvas = self.graph.screen.cv
+    if self.image is None or self.image.width() != w or self.image.height() != h:
+      self.image = tk.PhotoImage(master=self.graph.root, width=w, height=h)
+      if self.item is not None: canvas.delete(self.item)
+      self.item = canvas.create_image(0, 0, image=self.image, anchor="center")
+    canvas.tag_lower(self.item) # Under the axes and the function lines
+
+    tiles = [(left, top) for top in range(0, h, self.TILE_PIXELS) for left in range(0, w, self.TILE_PIXELS)]
+    tiles.sort(key=lambda tile: abs(tile[0] + self.TILE_PIXELS / 2 - w / 2) + abs(tile[1] + self.TILE_PIXELS / 2 - h / 2))
+    for left, top in tiles:
+      tile_x = x_values[left:left + self.TILE_PIXELS]
+      tile_a = a_values[top:top + self.TILE_PIXELS]
+      future = self.executor.submit(self.computeTile, tile_x, tile_a, self.b_value, self.n_value)
+      self.futures[future] = (left, top)
+    self.poll_id = self.graph.root.after(self.POLL_INTERVAL, self.poll)
+
+  @staticmethod
+  def computeTile(x_values: np.ndarray, a_values: np.ndarray, b: float, n: int):
+    # Worker thread: returns the tile as binary PPM data
+    values = weierstrassEngine.weierstrassSweep(a_values, np.full(len(a_values), b), x_values, n, threads=1)
+    bound = np.sum(np.power.outer(np.abs(a_values), np.arange(n + 1, dtype=np.float64)), axis=1) # Largest |W| of every row
+    t = np.clip(values / bound[:, None], -1.0, 1.0)
+    rgb = np.empty(t.shape + (3,), dtype=np.uint8)
+    rgb[..., 0] = np.rint(255 * np.minimum(1.0, 1.0 + t))
+    rgb[..., 1] = np.rint(255 * (1.0 - np.abs(t)))
+    rgb[..., 2] = np.rint(255 * np.minimum(1.0, 1.0 - t))
+    return f"P6 {len(x_values)} {len(a_values)} 255\n".encode() + rgb.tobytes()
+
+  def poll(self):
+    self.poll_id = None
+    for future in [future for future in self.futures if future.done()]:
+      left, top = self.futures.pop(future)
+      if future.cancelled(): continue
+      try:
+        data = future.result()
+      except Exception as e:
+        if not self.failed: messagebox.showerror("Computation Error", f"Failed to compute the parameter plane: {str(e)}")
+        self.failed = True
+        continue
+      tile = tk.PhotoImage(master=self.graph.root, data=data, format="PPM")
+      self.image.tk.call(self.image, "copy", tile, "-to", left, top)
+      self.tiles_done += 1
+    if self.futures: self.poll_id = self.graph.root.after(self.POLL_INTERVAL, self.poll)
+
+class PartialSumAnimation():
+  """Shows the partial sums S_0, S_1, ..., S_n of a series building up, one term per frame.
+  Every frame adds the next term to the y buffer in place, so a single accumulation buffer is kept.
+  Frames are paced by after() at the GUI frame rate target, the time spent computing and drawing is subtracted."""
+  def __init__(self, graph: Graph, helper: "HelperFunction", x_values: np.ndarray, add_term: Callable, n: int):
+    self.graph = graph
+    self.helper = helper
+    self.x_values = x_values
+    self.y_values = np.zeros_like(x_values)
+    self.add_term = add_term # add_term(y, i) turns S_(i-1) in y into S_i
+    self.n = n
+    self.term = 0 # Next term to add
+    self.paused = False
+    self.after_id: str | None = None
+
+  def isFinished(self):
+    return self.term > self.n
+
+  def start(self):
+    self.paused = False
+    self.frame()
+
+  def frame(self):
+    self.after_id = None
+    if self.paused or self.isFinished(): return
+    start = time.perf_counter()
+    self.stepTerm()
+    if self.isFinished(): return
+    interval = 1000.0 / self.graph.gui.animation_fps_value
+    elapsed = (time.perf_counter() - start) * 1000.0
+    self.after_id = self.graph.root.after(max(1, int(interval - elapsed)), self.frame)
+
+  def stepTerm(self):
+    self.add_term(self.y_values, self.term)
+    self.term += 1
+    self.helper.plotSamples(self.x_values, self.y_values)
+    self.graph.controller.updateController()
+
+  def togglePause(self):
+    if self.paused: self.start()
+    else: self.pause()
+
+  def pause(self):
+    self.paused = True
+    if self.after_id is not None:
+      self.graph.root.after_cancel(self.after_id)
+      self.after_id = None
+
+  def step(self):
+    # Pauses and shows the next partial sum
+    self.pause()
+    if not self.isFinished(): self.stepTerm()
+
+  def stop(self):
+    self.pause()
+
+class ExecutableRun():
+  """Output of a running executable, drained continuously by reader threads so the child never blocks on a full pipe.
+  The chunks are handed over to the Tk thread through a queue."""
+  read_size = 1 << 16
+
+  def __init__(self, process: subprocess.Popen, stream, helper: "HelperFunction | None"):
+    self.process = process
+    self.stream = stream # Incremental parser of stdout, see weierstrassNative.GroupBinaryStream
+    self.helper = helper
+    self.chunks: queue.Queue[bytes | None] = queue.Queue()
+    self.output = bytearray() # Raw stdout, kept when there is no stream to parse it
+    self.errors = bytearray()
+    self.stdout_closed = False
+    self.stdout_reader = threading.Thread(target=self.drain, args=(self.process.stdout, self.chunks.put), daemon=True)
+    self.stderr_reader = threading.Thread(target=self.drain, args=(self.process.stderr, self.errors.extend), daemon=True)
+    self.stdout_reader.start()
+    self.stderr_reader.start()
+
+  def drain(self, pipe, consume: Callable):
+    # Reader thread: hands over whatever is available as soon as it arrives
+    while True:
+      chunk = pipe.read1(self.read_size)
+      if not chunk: break
+      consume(chunk)
+    if pipe is self.process.stdout: self.chunks.put(None)
+
+  def readChunks(self):
+    """Parses the chunks received since the last call, returns the number of new records."""
+    new = 0
+    while True:
+      try:
+        chunk = self.chunks.get_nowait()
+      except queue.Empty:
+        break
+      if chunk is None:
+        self.stdout_closed = True
+      elif self.stream is not None:
+        new += self.stream.feed(chunk)
+      else: self.output.extend(chunk)
+    return new
+
+  def isFinished(self):
+    return self.stdout_closed and self.process.poll() is not None
 
 class GraphExecutableHandler():
   """Handles the execution of external executables for the graph.
-  Runs an external executable asynchronously while allowing a turtle graphics window to remain responsive."""
+  Runs an external executable asynchronously while allowing a turtle graphics window to remain responsive.
+  The output is read while the executable runs and the function's line grows as records arrive.
+  Every computation goes through a latest-wins scheduler keyed by function instance, so a new Run
+  kills or supersedes the previous one of the same function and stale results are never drawn."""
   def __init__(self, graph: Graph):
     self.graph = graph
     self.executable_names: list[str] = []
     self.executable_args: list[list[str]] = []
-    self.process: subprocess.Popen | None = None
-
-  def runExecutable(self, index: int):
+    self.executable_streams: list[Callable | None] = []
+    self.scheduler = ComputeScheduler()
+    self.poll_interval = 50 # ms
+    self.workers: list[ComputeWorker] = []
+    self.worker_requests: dict[ComputeWorker, dict[int, ComputeJob]] = {} # {worker: {request_id: job}}
+    self.worker_poll_interval = 2 # ms
+    self.worker_poll_id: str | None = None
+    self.pool_jobs: dict[ComputePool, dict[int, ComputeJob]] = {} # {pool: {task_id: job}}
+    self.pool_poll_id: str | None = None
+    self.tile_cache = TileCache() # Samples of the Engine backend, reused across pans and zooms
+    self.sample_store = SampleStore() # Samples of the Engine backend, kept across runs
+    self.tile_requests: dict[HelperFunction, tuple] = {} # {helper: (key, group, self-similarity)} of the last tiled Engine run, for the prefetcher
+    self.precision_modes = {"float32": 0, "float64": 0, "deep zoom": 0} # Engine evaluations per mode actually used
+    self.envelope_stats = {"envelopes": 0, "envelope columns": 0, "envelope points evaluated": 0}
+
+  def addExecutable(self, executable_name: str, executable_args: list[str] | None = None, stream: Callable | None = None):
+    """Registers an executable and returns its index.
+    stream creates the incremental parser of the stdout bytes (feed, samples, isComplete)."""
+    self.executable_names.append(executable_name)
+    self.executable_args.append(executable_args or [])
+    self.executable_streams.append(stream)
+    return len(self.executable_names) - 1
+
+  def runExecutable(self, index: int, run_args: list[str] | None = None, helper: "HelperFunction | None" = None):
     if index < 0 or index >= len(self.executable_names): return
     executable_name = self.executable_names[index]
-    executable_args = self.executable_args[index]
+    executable_args = [*(run_args or []), *self.executable_args[index]]
 
     if not os.path.isfile(executable_name):
       messagebox.showerror("File Not Found", f"The executable '{executable_name}' does not exist.")
       return
+
+    key = helper if helper is not None else index
+    self.scheduler.submit(key, lambda job: self.startExecutable(job, index, executable_args, helper), self.cancelExecutable)
+
+  def startExecutable(self, job: ComputeJob, index: int, executable_args: list[str], helper: "HelperFunction | None"):
+    executable_name = self.executable_names[index]
     try:
       # Start your executable asynchronously
-      self.process = subprocess.Popen(
+      process = subprocess.Popen(
           [executable_name, *executable_args],
           stdout=subprocess.PIPE,
-          stderr=subprocess.PIPE,
-          text=True
+          stderr=subprocess.PIPE
       )
     except Exception as e:
       messagebox.showerror("Execution Error", f"Failed to run '{executable_name}': {str(e)}")
+      self.scheduler.complete(job)
       return
-    
+
+    stream = None
+    if helper is not None and self.executable_streams[index] is not None:
+      stream = self.executable_streams[index]()
+    job.data = ExecutableRun(process, stream, helper)
     print(f"Running executable: {executable_name} with args: {executable_args}")
-    self.check_process()  # Start checking the process status
+    self.check_process(job)  # Start checking the process status
+
+  def cancelExecutable(self, job: ComputeJob):
+    if job.data is None: return False
+    job.data.process.kill() # Its reader threads and check_process wind down on their own
+    print(f"Cancelled superseded executable (generation {job.generation}).")
+    return True
 
-  def check_process(self):
-    if self.process is None:
-      print("No process running.")
+  def check_process(self, job: ComputeJob):
+    run: ExecutableRun = job.data
+    cancelled = not self.scheduler.isRunning(job)
+    try:
+      new = run.readChunks()
+    except Exception as e:
+      run.process.kill()
+      if not cancelled:
+        messagebox.showerror("Output Error", f"Failed to read the executable output: {str(e)}")
+        self.scheduler.complete(job)
       return
-    retcode = self.process.poll()  # Check if process is done
 
-    if retcode is None:
+    if new > 0 and not cancelled:
+      # Extend the line with the records received so far
+      run.helper.plotSamples(*run.stream.samples())
+      self.graph.controller.updateController()
+
+    if not run.isFinished():
       # Process still running: keep turtle moving or doing stuff
-      self.graph.screen.ontimer(self.check_process, 500)  # Check again after 500ms
-    else:
-      # Process finished, read output
-      stdout, stderr = self.process.communicate()
+      self.graph.root.after(self.poll_interval, lambda: self.check_process(job))
+    elif not cancelled:
+      run.stderr_reader.join()
       print("Executable finished!")
-      print("Output:\n", stdout)
-      if stderr:
-          print("Errors:\n", stderr)
-      self.process = None  # Clear the process reference
-      
-      # # Optionally stop turtle or do something else
-      # t.write("Done!", font=("Arial", 16, "normal"))
+      if run.errors:
+          print("Errors:\n", run.errors.decode(errors="replace"))
+      if run.stream is None:
+        print("Output:\n", run.output.decode(errors="replace"))
+      elif not run.stream.isComplete():
+        print(f"Executable exited with code {run.process.returncode} before writing all of its output.")
+      self.scheduler.complete(job)
+
+  def addWorker(self, worker: ComputeWorker):
+    self.workers.append(worker)
+    self.worker_requests[worker] = {}
+    return worker
+
+  def stopWorkers(self):
+    for worker in self.workers:
+      worker.stop()
+    for pool in self.pool_jobs:
+      pool.stop()
+
+  def runWorker(self, helper: "HelperFunction"):
+    """Sends the parameters of a function to its persistent worker, the samples are plotted by checkWorkers.
+    A worker request cannot be aborted, so while one is in flight only the latest new request waits for it."""
+    params = helper.getWorkerParams()
+    self.scheduler.submit(helper, lambda job: self.startWorkerJob(job, helper, params))
+
+  def startWorkerJob(self, job: ComputeJob, helper: "HelperFunction", params: dict):
+    worker = helper.accessory.worker
+    try:
+      job.data = worker.submit(params)
+    except Exception as e:
+      messagebox.showerror("Worker Error", f"Failed to reach the {worker.function_name} worker: {str(e)}")
+      self.scheduler.complete(job)
+      return
+
+    self.worker_requests[worker][job.data] = job
+    if self.worker_poll_id is None: self.checkWorkers()
+
+  def checkWorkers(self):
+    self.worker_poll_id = None
+    updated = False
+    for worker, jobs in self.worker_requests.items():
+      for request_id, x_values, y_values, message in worker.poll():
+        job = jobs.pop(request_id, None)
+        if job is None or not self.scheduler.complete(job): continue # Superseded, drop the stale result
+        if x_values is None:
+          messagebox.showerror("Computation Error", f"Failed to compute '{worker.function_name}': {message}")
+        else:
+          job.key.plotSamples(x_values, y_values)
+          updated = True
+
+    if updated: self.graph.controller.updateController()
+    if any(self.worker_requests.values()):
+      self.worker_poll_id = self.graph.root.after(self.worker_poll_interval, self.checkWorkers)
+
+  def addPool(self, pool: ComputePool):
+    self.pool_jobs[pool] = {}
+    return pool
+
+  def resizePools(self, size: int):
+    for pool in self.pool_jobs:
+      pool.resize(size)
+
+  def runAll(self):
+    """Computes every active function concurrently on the pools, the ones visible in the viewport first."""
+    for helper in self.graph.functions_list_objs:
+      if helper.accessory.pool is not None: self.runPool(helper)
+
+  def runPool(self, helper: "HelperFunction"):
+    """Queues the parameters of a function on the pool of its type, the samples are plotted by checkPools."""
+    params = helper.getWorkerParams()
+    priority = PRIORITY_VISIBLE if self.graph.view.isVisible(helper) else PRIORITY_HIDDEN
+    self.scheduler.submit(helper, lambda job: self.startPoolJob(job, helper, params, priority), self.cancelPoolJob)
+
+  def startPoolJob(self, job: ComputeJob, helper: "HelperFunction", params: dict, priority: int):
+    pool = helper.accessory.pool
+    try:
+      job.data = pool.submit(params, priority)
+    except Exception as e:
+      messagebox.showerror("Worker Error", f"Failed to reach the {pool.function_name} pool: {str(e)}")
+      self.scheduler.complete(job)
+      return
+
+    self.pool_jobs[pool][job.data] = job
+    if self.pool_poll_id is None: self.checkPools()
+
+  def cancelPoolJob(self, job: ComputeJob):
+    # Only a task still queued can be dropped, a dispatched one is superseded when it completes
+    pool = job.key.accessory.pool
+    if job.data is None or not pool.cancel(job.data): return False
+    self.pool_jobs[pool].pop(job.data, None)
+    return True
+
+  def checkPools(self):
+    # Runs on the Tk thread, it only collects what the pools already received and never waits for a worker
+    self.pool_poll_id = None
+    updated = False
+    for pool, jobs in self.pool_jobs.items():
+      for task_id, x_values, y_values, message in pool.poll():
+        job = jobs.pop(task_id, None)
+        if job is None or not self.scheduler.complete(job): continue # Superseded, drop the stale result
+        if x_values is None:
+          messagebox.showerror("Computation Error", f"Failed to compute '{pool.function_name}': {message}")
+        else:
+          job.key.plotSamples(x_values, y_values)
+          updated = True
+
+    if updated: self.graph.controller.updateController()
+    if any(self.pool_jobs.values()):
+      self.pool_poll_id = self.graph.root.after(self.worker_poll_interval, self.checkPools)
+
+  def runEngine(self, helper: "HelperFunction"):
+    """Computes the samples of a function in process with its engine and plots them."""
+    args = helper.getEngineArgs()
+    self.scheduler.submit(helper, lambda job: self.startEngineJob(job, helper, args))
+
+  def startEngineJob(self, job: ComputeJob, helper: "HelperFunction", args: tuple):
+    function_name = helper.accessory.function_name
+    tile_request = helper.getTileRequest(args) if self.graph.gui.tile_cache_enabled.get() else None
+    store_params = helper.getStoreParams(args) if self.graph.gui.disk_cache_enabled.get() else None
+    envelope_args = helper.getEnvelopeArgs(args) if self.graph.gui.envelope_rendering.get() else None
+    if envelope_args is not None:
+      self.startEnvelopeJob(job, helper, envelope_args)
+      return
+    self_similarity = helper.getSelfSimilarity(args) if tile_request is not None else None
+    try:
+      if tile_request is None and store_params is not None:
+        x_values, y_values = self.sample_store.getOrCompute(store_params, lambda: helper.accessory.engine(*args))
+      elif tile_request is None: x_values, y_values = helper.accessory.engine(*args)
+      elif self_similarity is not None:
+        key, group, min_x, max_x, N = tile_request
+        x_values, y_values = self.tile_cache.assembleSelfSimilar(key, *self_similarity, min_x, max_x, N)
+        self.tile_requests[helper] = (key, group, self_similarity)
+      else:
+        x_values, y_values = self.tile_cache.assemble(*tile_request)
+        self.tile_requests[helper] = (*tile_request[:2], None)
+    except Exception as e:
+      self.scheduler.complete(job)
+      messagebox.showerror("Computation Error", f"Failed to compute '{function_name}': {str(e)}")
+      return
+
+    if not self.scheduler.complete(job): return
+    helper.plotSamples(x_values, y_values, helper.getSampleOrigin(args))
+    self.graph.controller.updateController()
+
+  def startEnvelopeJob(self, job: ComputeJob, helper: "HelperFunction", envelope_args: tuple):
+    function_name = helper.accessory.function_name
+    try:
+      x_values, lower, upper, evaluations = helper.accessory.envelope(*envelope_args)
+    except Exception as e:
+      self.scheduler.complete(job)
+      messagebox.showerror("Computation Error", f"Failed to compute the envelope of '{function_name}': {str(e)}")
+      return
+
+    if not self.scheduler.complete(job): return
+    self.envelope_stats["envelopes"] += 1
+    self.envelope_stats["envelope columns"] += len(x_values)
+    self.envelope_stats["envelope points evaluated"] += evaluations
+    helper.plotEnvelope(x_values, lower, upper)
+    self.graph.controller.updateController()
+
+  def cancelFunction(self, helper: "HelperFunction"):
+    self.scheduler.forget(helper)
+    self.tile_requests.pop(helper, None)
 
 class GenericFunction():
   def __init__(self, graph: Graph):
@@ -1170,6 +1984,10 @@ class GenericFunction():
     self.executable_name = ""
     self.executable_args: list[str] = []
     self.executable_index = -1
+    self.engine: Callable | None = None # In process replacement for the executable
+    self.envelope: Callable | None = None # Per pixel column min/max bounds, see weierstrassEngine.weierstrassEnvelope
+    self.worker: ComputeWorker | None = None # Persistent process shared by every function of this type
+    self.pool: ComputePool | None = None # Worker processes evaluating the functions of this type concurrently
     self.popup: tk.Toplevel | None = None
     self.popupCalls: list[Callable] = []
     self.func_parameters = []
@@ -1177,6 +1995,10 @@ class GenericFunction():
   
   def removeFunction(self, index: int, multiple = False):
     print(f"Removing function at index {index} from the list.")
+    removed = self.graph.functions_list_objs[index]
+    if removed.line is not None: removed.line.deleted = True
+    removed.stopAnimation()
+    self.graph.executableHandler.cancelFunction(removed)
     self.graph.functions_list_objs = self.graph.model.splice(self.graph.functions_list_objs, index, True)
     self.deletion_list = self.graph.model.splice(self.deletion_list, index, True)
     l = len(self.graph.functions_list_objs)
@@ -1257,22 +2079,65 @@ class WeierstrassFunction(GenericFunction):
   def __init__(self, graph: Graph):
     super().__init__(graph)
     self.function_name = "Weierstrass"
-    self.executable_name = "bin/Weierstrass.exe"
+    self.executable_name = weierstrassNative.executablePath()
+    self.executable_args = ["--binary"]
+    self.executable_index = self.graph.executableHandler.addExecutable(self.executable_name, self.executable_args, weierstrassNative.GroupBinaryStream)
+    self.group = weierstrassEngine.weierstrassGroup
+    self.deep_group = weierstrassEngine.weierstrassGroupDeep
+    self.mode_group = weierstrassEngine.weierstrassGroupMode
+    if weierstrassNative.isAvailable():
+      self.group = weierstrassNative.weierstrassGroup
+      self.deep_group = weierstrassNative.weierstrassGroupDeep
+      self.mode_group = weierstrassNative.weierstrassGroupMode
+    self.engine = self.weierstrassGroup
+    self.envelope = weierstrassEngine.weierstrassEnvelope
+    self.worker = self.graph.executableHandler.addWorker(ComputeWorker(self.function_name))
+    self.pool = self.graph.executableHandler.addPool(ComputePool(self.function_name, self.graph.gui.compute_number_value))
     self.graph.gui.callables.append(lambda: self.graph.gui.function_list_menu.add_command(label="Add new Weierstrass Function", command=self.addFunction))
     self.graph.gui.callCallables()
   
+  def weierstrassGroup(self, a: float, b: float, min_x: float, max_x: float, n: int, N: int, origin: Fraction = Fraction(0)):
+    gui = self.graph.gui
+    modes = self.graph.executableHandler.precision_modes
+    # Deep zooms reduce b^i * x modulo 2 exactly, float64 arguments would only give noise there
+    if origin != 0 or weierstrassEngine.deepZoomNeeded(a, b, n, min_x, max_x, N):
+      modes["deep zoom"] += 1
+      return self.deep_group(a, b, min_x, max_x, n, N, origin)
+    if gui.float32_enabled.get():
+      x_values, y_values, mode = self.mode_group(a, b, min_x, max_x, n, N, True, gui.float32_budget_value)
+      modes[mode] += 1
+      return x_values, y_values
+    modes["float64"] += 1
+    # With the cosine rows cached, a grid evaluated again with another a costs a dot product instead of (n + 1) * (N + 1) cosines,
+    # a grid seen for the first time goes to the (native) kernel, building rows for it would only slow it down
+    if gui.cosine_cache_enabled.get() and weierstrassEngine.COSINE_ROWS.repeats(b, min_x, max_x, N): return weierstrassEngine.weierstrassGroupCached(a, b, min_x, max_x, n, N)
+    return self.group(a, b, min_x, max_x, n, N)
+
+  def weierstrassGroupExact(self, a: float, b: float, n: int, origin: Fraction, step: Fraction, count: int):
+    # y of the count points origin + k * step (the b-adic tiles), with the precision selection of weierstrassGroup
+    intervals = max(1, count - 1)
+    min_x, max_x = float(origin), float(origin + step * intervals)
+    if weierstrassEngine.deepZoomNeeded(a, b, n, min_x, max_x, intervals):
+      self.graph.executableHandler.precision_modes["deep zoom"] += 1
+      return self.deep_group(a, b, Fraction(0), step * intervals, n, intervals, origin)[1][:count]
+    return self.weierstrassGroup(a, b, min_x, max_x, n, intervals)[1][:count]
+
   def addFunction(self):
     index = len(self.graph.functions_list_objs)
     WeierstrassFunctionHelper(index, self.executable_index, self)
     self.deletion_list.append(False)
+    if self.graph.gui.compute_backend.get() == "Worker" and not self.worker.isRunning():
+      self.worker.start() # Start ahead of the first Run
 
 class HelperFunction():
   def __init__(self, list_index: int, executable_index: int, generic: GenericFunction):
     self.accessory = generic
     self.list_index = list_index
     self.executable_index = executable_index
+    self.line: FunctionLine | None = None
     self.accessory.graph.functions_list_objs.append(self)
-    self.row_count = 1
+    self.row_count = 2
+    self.animation: PartialSumAnimation | None = None
     self.accessory.deletion_list.append(False)
     if list_index == 0: self.accessory.graph.gui.updateMenuBar()
     else: self.updateFunctionMenuBar()
@@ -1317,18 +2182,111 @@ class HelperFunction():
     removeBtn = ttk.Button(self.accessory.popup, text="Remove", style="RedButton.TButton", command=lambda: self.accessory.removeFunction(self.list_index, False))
     removeBtn.grid(row=0, column=0, padx=(10, 10), pady=(2,2))
 
-    runBtn = ttk.Button(self.accessory.popup, text="Run", style="GreenButton.TButton", command=lambda: self.accessory.graph.executableHandler.runExecutable(self.executable_index))
+    runBtn = ttk.Button(self.accessory.popup, text="Run", style="GreenButton.TButton", command=self.run)
     runBtn.grid(row=0, column=1, padx=(10, 10), pady=(2,2))
 
     markBtn = ttk.Button(self.accessory.popup, text="Mark", style="BlueButton.TButton", command=lambda: self.toggleMarkFunction(self.accessory.deletion_list))
     markBtn.grid(row=0, column=2, padx=(10, 10), pady=(2,2))
 
+    animateBtn = ttk.Button(self.accessory.popup, text="Animate", style="GreenButton.TButton", command=self.animate)
+    animateBtn.grid(row=1, column=0, padx=(10, 10), pady=(2,2))
+
+    pauseBtn = ttk.Button(self.accessory.popup, text="Pause", style="BlueButton.TButton", command=lambda: self.animation is not None and self.animation.togglePause())
+    pauseBtn.grid(row=1, column=1, padx=(10, 10), pady=(2,2))
+
+    stepBtn = ttk.Button(self.accessory.popup, text="Step", style="BlueButton.TButton", command=self.stepAnimation)
+    stepBtn.grid(row=1, column=2, padx=(10, 10), pady=(2,2))
+
     for popupCall in self.accessory.popupCalls:
       popupCall()
     
     self.accessory.popup.focus_set()
     return self.accessory.popup
 
+  def run(self):
+    handler = self.accessory.graph.executableHandler
+    self.stopAnimation()
+    if self.accessory.graph.gui.viewport_sampling.get(): self.fitToViewport()
+    backend = self.accessory.graph.gui.compute_backend.get()
+    if backend == "Engine" and self.accessory.engine is not None:
+      handler.runEngine(self)
+    elif backend == "Worker" and self.accessory.worker is not None:
+      handler.runWorker(self)
+    elif backend == "Pool" and self.accessory.pool is not None:
+      handler.runPool(self)
+    else: handler.runExecutable(self.executable_index, self.getExecutableArgs(), self)
+
+  def animate(self):
+    """Restarts the partial sum animation of this function."""
+    self.stopAnimation()
+    animation_args = self.getAnimationArgs()
+    if animation_args is None: return
+    self.accessory.graph.executableHandler.cancelFunction(self) # A Run still in flight would overwrite the frames
+    self.animation = PartialSumAnimation(self.accessory.graph, self, *animation_args)
+    self.animation.start()
+
+  def stepAnimation(self):
+    if self.animation is None or self.animation.isFinished():
+      self.animate()
+      if self.animation is not None: self.animation.pause()
+    else: self.animation.step()
+
+  def stopAnimation(self):
+    if self.animation is not None:
+      self.animation.stop()
+      self.animation = None
+
+  def getAnimationArgs(self) -> tuple | None:
+    """Returns (x_values, add_term, n) for PartialSumAnimation, or None when this function is not a series."""
+    return None
+
+  def getEngineArgs(self) -> tuple:
+    return ()
+
+  def getExecutableArgs(self) -> list[str]:
+    return []
+
+  def getWorkerParams(self) -> dict:
+    return {}
+
+  def getXRange(self) -> tuple[float, float] | None:
+    return None
+
+  def fitToViewport(self) -> bool:
+    """Takes the x interval and the number of samples from the viewport, returns True when they changed."""
+    return False
+
+  def getTileRequest(self, engine_args: tuple) -> tuple | None:
+    """Returns the arguments of TileCache.assemble (key, group, min_x, max_x, N) for engine_args,
+    or None when the samples of this function cannot be cached in tiles."""
+    return None
+
+  def getSelfSimilarity(self, engine_args: tuple) -> tuple | None:
+    """Returns (a, b, n, group) when the tiles of engine_args can be derived from coarser ones with
+    W(x) = cos(pi x) + a W(b x) (see TileCache.assembleSelfSimilar), None otherwise."""
+    return None
+
+  def getStoreParams(self, engine_args: tuple) -> dict | None:
+    """Returns the parameters identifying engine_args in the disk cache (see sampleStore.sampleKey),
+    or None when the samples of this function cannot be stored."""
+    return None
+
+  def getEnvelopeArgs(self, engine_args: tuple) -> tuple | None:
+    """Returns the arguments of the envelope of engine_args, or None when this function has no envelope."""
+    return None
+
+  def getSampleOrigin(self, engine_args: tuple) -> Fraction:
+    """Returns the origin the x values computed by the engine for engine_args are relative to."""
+    return Fraction(0)
+
+  def plotSamples(self, x_values: np.ndarray, y_values: np.ndarray, origin_x: Fraction = Fraction(0)):
+    if self.line is None: self.line = FunctionLine(self.accessory.graph)
+    self.line.setData(x_values, y_values, origin_x)
+
+  def plotEnvelope(self, x_values: np.ndarray, lower: np.ndarray, upper: np.ndarray):
+    if self.line is None: self.line = FunctionLine(self.accessory.graph)
+    self.line.setEnvelope(x_values, lower, upper)
+
   def clickOutside(self, event):
     if self.accessory.popup and self.accessory.popup.winfo_exists():
       # Check if the click was outside the popup
@@ -1357,8 +2315,90 @@ class WeierstrassFunctionHelper(HelperFunction):
     self.range_value: str | float = "None"
     self.n_value = 20
     self.N_value = 100
+    self.min_x_value = -2.0 # Relative to origin_x_value
+    self.max_x_value = 2.0
+    self.origin_x_value = Fraction(0) # Non zero only for views float64 cannot resolve, see viewCoordinates.foldOrigin
   #   self.setASlider()
 
+  def getTerms(self, a: float, b: float):
+    """n_value, or in automatic mode the fewest terms whose tail stays under the term tolerance
+    (in pixels of the current scale_y) without going past the Nyquist limit of the grid."""
+    gui = self.accessory.graph.gui
+    pixel_height = self.accessory.graph.view.pixelHeight()
+    if not gui.auto_terms.get() or pixel_height is None: return self.n_value
+    step = (self.max_x_value - self.min_x_value) / self.N_value
+    return weierstrassEngine.autoTerms(a, b, pixel_height * gui.term_tolerance_value, step, self.n_value)
+
+  def getEngineArgs(self):
+    a, b, _ = weierstrassEngine.random_a_b(self.a_value, self.b_value, self.range_value)
+    return (a, b, self.min_x_value, self.max_x_value, self.getTerms(a, b), self.N_value, self.origin_x_value)
+
+  def getExecutableArgs(self):
+    n = self.getTerms(self.a_value, self.b_value)
+    min_x, max_x = self.getXRange()
+    params = [self.a_value, self.b_value, self.range_value, min_x, max_x, n, self.N_value]
+    return [str(param) for param in params]
+
+  def getWorkerParams(self):
+    min_x, max_x = self.getXRange()
+    return {
+      "a": self.a_value, "b": self.b_value, "range": self.range_value, "n": self.getTerms(self.a_value, self.b_value),
+      "min_x": min_x, "max_x": max_x, "N": self.N_value
+    }
+
+  def getXRange(self):
+    # Absolute, only the engine evaluates relative to origin_x_value
+    origin_x = float(self.origin_x_value)
+    return (origin_x + self.min_x_value, origin_x + self.max_x_value)
+
+  def getSampleOrigin(self, engine_args: tuple):
+    return engine_args[6]
+
+  def getTileRequest(self, engine_args: tuple):
+    a, b, min_x, max_x, n, N, origin = engine_args
+    if origin != 0: return None
+    group = lambda tile_min_x, tile_max_x, tile_N: self.accessory.engine(a, b, tile_min_x, tile_max_x, n, tile_N)
+    float32 = self.accessory.graph.gui.float32_enabled.get() # Kept apart from the float64 tiles
+    return ((self.accessory.function_name, a, b, n, float32), group, min_x, max_x, N)
+
+  def getSelfSimilarity(self, engine_args: tuple):
+    a, b, min_x, max_x, n, N, origin = engine_args
+    if origin != 0 or not float(b).is_integer(): return None
+    # Past the last b-adic level (or for a large b) the tiles fall back to assemble, which goes deep itself when needed
+    if tileCache.selfSimilarLevel(int(b), min_x, max_x, N) is None: return None
+    group = lambda tile_origin, step, count: self.accessory.weierstrassGroupExact(a, b, n, tile_origin, step, count)
+    return (a, int(b), n, group)
+
+  def getAnimationArgs(self):
+    a, b, min_x, max_x, n, N, origin = self.getEngineArgs()
+    if origin != 0: return None # addTerm evaluates absolute float64 x values
+    x_values = weierstrassEngine.gridX(min_x, max_x, N)
+    return (x_values, lambda y_values, i: weierstrassEngine.addTerm(y_values, x_values, a, b, i), n)
+
+  def getEnvelopeArgs(self, engine_args: tuple):
+    # One column per pixel spanned by [min_x, max_x], refined until the bounds are within a pixel
+    view = self.accessory.graph.view
+    pixel_width, pixel_height = view.pixelWidth(), view.pixelHeight()
+    if self.accessory.envelope is None or pixel_width is None: return None
+    a, b, min_x, max_x, n, _, origin = engine_args
+    if origin != 0: return None
+    w, _ = self.accessory.graph.getWindowSize()
+    columns = min(4 * w, max(1, math.ceil((max_x - min_x) / pixel_width)))
+    return (a, b, min_x, max_x, columns, n, pixel_height)
+
+  def getStoreParams(self, engine_args: tuple):
+    a, b, min_x, max_x, n, N, origin = engine_args
+    if origin != 0 or self.accessory.graph.gui.float32_enabled.get(): return None # The store holds float64 samples
+    return {"function": self.accessory.function_name, "a": a, "b": b, "n": n, "min_x": min_x, "max_x": max_x, "N": N}
+
+  def fitToViewport(self):
+    sampling = self.accessory.graph.view.viewportSampling()
+    if sampling is not None and sampling[3] == 0: # Commensurate with the period, so the engine tiles one period
+      sampling = (*weierstrassEngine.commensurateGrid(self.b_value, *sampling[:3]), sampling[3])
+    if sampling is None or sampling == (self.min_x_value, self.max_x_value, self.N_value, self.origin_x_value): return False
+    self.min_x_value, self.max_x_value, self.N_value, self.origin_x_value = sampling
+    return True
+
   # # Parameter a functions
   # def setASlider(self):
   #   self.a_slider_from_ = 0.0
@@ -0,0 +1,206 @@
+"""
+Persistent on-disk store of computed samples, kept across runs of the viewer.
+
+Every sample set is one .npy file holding a (2, N + 1) float64 array (x row then y row), named after
+a hash of (function name, a, b, n, min_x, max_x, N). Reloads memory-map the file instead of recomputing.
+index.json records the size and last use of every file, the least recently used files are deleted
+once the store grows beyond its size cap. Hits only touch the index in memory, it is written on save,
+eviction, clear and flush (on exit).
+
+Run as a script to warm the store for a parameter grid:
+  python sampleStore.py warm --a 0.3 0.5 0.7 --b 3 5 7 --n 20 40 --min-x -2 --max-x 2 --N 100000
+"""
+import hashlib
+import itertools
+import json
+import os
+import time
+from typing import Callable
+import numpy as np
+
+DEFAULT_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")
+DEFAULT_MAX_BYTES = 512 << 20
+INDEX_NAME = "index.json"
+
+
+def sampleKey(params: dict):
+  """
+  Hash of the parameters that define a sample set: function, a, b, n, min_x, max_x and N
+  """
+  fields = [params["function"], float(params["a"]), float(params["b"]), int(params["n"]), float(params["min_x"]), float(params["max_x"]), int(params["N"])]
+  return hashlib.sha256(json.dumps(fields).encode()).hexdigest()[:32]
+
+class SampleStore():
+  def __init__(self, directory: str = DEFAULT_DIRECTORY, max_bytes: int = DEFAULT_MAX_BYTES):
+    self.directory = directory
+    self.max_bytes = max_bytes
+    self.index: dict[str, dict] = {} # {key: {"bytes": int, "last_used": float, "params": dict}}
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+    self.dirty = False # last_used changed since the index was written
+    self.loadIndex()
+
+  def indexPath(self):
+    return os.path.join(self.directory, INDEX_NAME)
+
+  def samplePath(self, key: str):
+    return os.path.join(self.directory, f"{key}.npy")
+
+  def loadIndex(self):
+    try:
+      with open(self.indexPath(), "r") as f:
+        self.index = json.load(f)
+    except (OSError, ValueError):
+      self.index = {}
+    # Drop the entries whose file is gone
+    self.index = {key: entry for key, entry in self.index.items() if os.path.isfile(self.samplePath(key))}
+
+  def saveIndex(self):
+    os.makedirs(self.directory, exist_ok=True)
+    tmp = self.indexPath() + ".tmp"
+    with open(tmp, "w") as f:
+      json.dump(self.index, f)
+    os.replace(tmp, self.indexPath())
+    self.dirty = False
+
+  def flush(self):
+    if self.dirty: self.saveIndex()
+
+  def setDirectory(self, directory: str):
+    self.flush()
+    self.directory = directory
+    self.loadIndex()
+
+  def setMaxBytes(self, max_bytes: int):
+    self.max_bytes = max_bytes
+    self.evict()
+    self.saveIndex()
+
+  def size(self):
+    return sum(entry["bytes"] for entry in self.index.values())
+
+  def load(self, params: dict):
+    """
+    Returns read-only memory-mapped (x, y) arrays, or None when the sample set is not stored
+    """
+    key = sampleKey(params)
+    if key not in self.index:
+      self.misses += 1
+      return None
+    try:
+      samples = np.load(self.samplePath(key), mmap_mode="r")
+    except (OSError, ValueError):
+      self.index.pop(key)
+      self.misses += 1
+      return None
+    self.index[key]["last_used"] = time.time()
+    self.dirty = True
+    self.hits += 1
+    return samples[0], samples[1]
+
+  def save(self, params: dict, x_values: np.ndarray, y_values: np.ndarray):
+    key = sampleKey(params)
+    os.makedirs(self.directory, exist_ok=True)
+    path = self.samplePath(key)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+      np.save(f, np.stack((x_values, y_values)).astype(np.float64, copy=False))
+    os.replace(tmp, path)
+    self.index[key] = {"bytes": os.path.getsize(path), "last_used": time.time(), "params": params}
+    self.evict()
+    self.saveIndex()
+
+  def evict(self):
+    total = self.size()
+    for key in sorted(self.index, key=lambda key: self.index[key]["last_used"]):
+      if total <= self.max_bytes: break
+      try:
+        os.remove(self.samplePath(key))
+      except FileNotFoundError:
+        pass
+      except OSError:
+        continue # Still mapped (Windows), retried on the next eviction
+      total -= self.index.pop(key)["bytes"]
+      self.evictions += 1
+
+  def getOrCompute(self, params: dict, compute: Callable):
+    """
+    Returns (x, y) from the store, or computes them with compute() -> (x, y) and stores them
+    """
+    samples = self.load(params)
+    if samples is not None: return samples
+    x_values, y_values = compute()
+    self.save(params, x_values, y_values)
+    return x_values, y_values
+
+  def clear(self):
+    for key in list(self.index):
+      try:
+        os.remove(self.samplePath(key))
+      except OSError:
+        pass
+    self.index = {}
+    self.saveIndex()
+
+  def stats(self):
+    return {
+      "directory": self.directory,
+      "sample sets": len(self.index),
+      "size": f"{self.size() / (1 << 20):.2f} / {self.max_bytes / (1 << 20):.2f} MB",
+      "hits": self.hits,
+      "misses": self.misses,
+      "evictions": self.evictions,
+    }
+
+
+def weierstrassParams(a: float, b: float, min_x: float, max_x: float, n: int, N: int):
+  return {"function": "Weierstrass", "a": a, "b": b, "n": n, "min_x": min_x, "max_x": max_x, "N": N}
+
+def warm(store: SampleStore, a_values: list[float], b_values: list[float], n_values: list[int], min_x: float, max_x: float, N: int):
+  """
+  Computes and stores every (a, b, n) combination that is not stored yet, returns the number computed
+  """
+  import weierstrassEngine
+  import weierstrassNative
+  group = weierstrassNative.weierstrassGroup if weierstrassNative.isAvailable() else weierstrassEngine.weierstrassGroup
+
+  computed = 0
+  for a, b, n in itertools.product(a_values, b_values, n_values):
+    params = weierstrassParams(a, b, min_x, max_x, n, N)
+    if sampleKey(params) in store.index: continue
+    x_values, y_values = group(a, b, min_x, max_x, n, N)
+    store.save(params, x_values, y_values)
+    computed += 1
+    print(f"Stored a={a} b={b} n={n}")
+  return computed
+
+
+def main():
+  import argparse
+  parser = argparse.ArgumentParser(description="On-disk store of Weierstrass samples.")
+  parser.add_argument("--directory", default=DEFAULT_DIRECTORY)
+  parser.add_argument("--max-mb", type=int, default=DEFAULT_MAX_BYTES >> 20, help="size cap of the store in MB")
+  commands = parser.add_subparsers(dest="command", required=True)
+  warm_parser = commands.add_parser("warm", help="compute the samples of a parameter grid ahead of time")
+  warm_parser.add_argument("--a", type=float, nargs="+", required=True)
+  warm_parser.add_argument("--b", type=float, nargs="+", required=True)
+  warm_parser.add_argument("--n", type=int, nargs="+", default=[20])
+  warm_parser.add_argument("--min-x", type=float, default=-2.0)
+  warm_parser.add_argument("--max-x", type=float, default=2.0)
+  warm_parser.add_argument("--N", type=int, default=100)
+  commands.add_parser("stats", help="print the content of the store")
+  commands.add_parser("clear", help="delete every stored sample set")
+  args = parser.parse_args()
+
+  store = SampleStore(args.directory, args.max_mb << 20)
+  if args.command == "warm":
+    computed = warm(store, args.a, args.b, args.n, args.min_x, args.max_x, args.N)
+    print(f"Computed {computed} sample sets.")
+  elif args.command == "clear":
+    store.clear()
+  for name, value in store.stats().items():
+    print(f"{name.capitalize()}: {value}")
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,252 @@
+"""
+Multi-resolution cache of function samples, reused across pans and zooms.
+
+Samples live on the global grid x = k * step with step = 2^level, the level being picked so that
+the step is at most the requested one. The grid is cut into tiles of TILE_SAMPLES consecutive k,
+so the same tile serves every view that overlaps it at that zoom level.
+Tiles are keyed by (function key, level, tile index) and evicted least recently used first
+once the memory budget is exceeded.
+
+For the Weierstrass function with an integer b, assembleSelfSimilar uses the b-adic grid x = 2k / b^level
+instead, one period of b^level samples per level. There the functional equation
+  W(x) = cos(pi x) + a W(b x) - a^(n+1) cos(b^(n+1) pi x)   (exact for n terms)
+maps sample k of a level to sample k mod b^(level-1) of the coarser level, so a zoomed in tile is derived
+from cached coarse tiles with two cosines per sample instead of n + 1. The level is the coarsest one resolving
+the requested step, so it oversamples up to b times (the samples are thinned out before they are returned):
+only a b up to SELF_SIMILAR_MAX_B is worth it, and only while b^level stays within SELF_SIMILAR_MAX_INDEX.
+"""
+import math
+from collections import OrderedDict
+from typing import Callable, Hashable
+from fractions import Fraction
+import numpy as np
+
+TILE_SAMPLES = 256
+DEFAULT_BUDGET = 64 << 20 # bytes
+# Largest b for which the b-adic levels are used
+SELF_SIMILAR_MAX_B = 8
+# Bound on b^level and on the b-adic indices of the samples, kept well within float64 integers
+SELF_SIMILAR_MAX_INDEX = 1 << 48
+
+
+def tileLevel(min_x: float, max_x: float, N: int):
+  """
+  Zoom level whose step 2^level is the largest power of two not above (max_x - min_x) / N
+  """
+  return math.floor(math.log2((max_x - min_x) / N))
+
+def tileSpan(min_x: float, max_x: float, N: int):
+  """
+  Returns (level, step, first, last): the zoom level, its step and the global indices of the samples
+  at or just beyond both ends of [min_x, max_x]
+  """
+  if N <= 0: raise ValueError("N must be positive.")
+  if min_x >= max_x: raise ValueError("min_x must be less than max_x.")
+  level = tileLevel(min_x, max_x, N)
+  step = 2.0 ** level
+  return level, step, math.floor(min_x / step), math.ceil(max_x / step)
+
+def selfSimilarLevel(b: int, min_x: float, max_x: float, N: int):
+  """
+  Smallest b-adic level whose step 2 / b^level is at most (max_x - min_x) / N,
+  or None when b is out of range or the level would exceed SELF_SIMILAR_MAX_INDEX
+  """
+  if N <= 0: raise ValueError("N must be positive.")
+  if min_x >= max_x: raise ValueError("min_x must be less than max_x.")
+  if b < 2 or b > SELF_SIMILAR_MAX_B: return None
+  level, period = 0, 1
+  while 2.0 / period > (max_x - min_x) / N:
+    level, period = level + 1, period * b
+    if period > SELF_SIMILAR_MAX_INDEX: return None
+  if max(abs(min_x), abs(max_x)) * period / 2.0 > SELF_SIMILAR_MAX_INDEX: return None
+  return level
+
+def selfSimilarIndices(level: int, step: float, min_x: float, max_x: float, N: int):
+  # b-adic indices of the samples returned for [min_x, max_x], every stride-th one so the step stays close to the requested one
+  stride = max(1, math.floor((max_x - min_x) / N / step))
+  first, last = math.floor(min_x / step), math.ceil(max_x / step)
+  first -= first % stride
+  count = -(-(last - first) // stride) + 1
+  return first + np.arange(count, dtype=np.int64) * stride
+
+class TileCache():
+  def __init__(self, budget: int = DEFAULT_BUDGET):
+    self.budget = budget
+    self.tiles: OrderedDict[tuple, np.ndarray] = OrderedDict() # {(key, level, index): y values}, oldest first
+    self.size = 0 # bytes held by the tiles
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+    self.prefetched = 0 # Tiles computed ahead of a request
+    self.derived = 0 # b-adic tiles derived from their coarser level by self-similarity
+    self.direct = 0 # b-adic tiles evaluated directly, their coarser tiles were not cached
+
+  def setBudget(self, budget: int):
+    self.budget = budget
+    self.evict()
+
+  def evict(self):
+    while self.size > self.budget and self.tiles:
+      _, y_values = self.tiles.popitem(last=False)
+      self.size -= y_values.nbytes
+      self.evictions += 1
+
+  def clear(self):
+    self.tiles.clear()
+    self.size = 0
+
+  def get(self, tile: tuple):
+    y_values = self.tiles.get(tile)
+    if y_values is None:
+      self.misses += 1
+      return None
+    self.tiles.move_to_end(tile)
+    self.hits += 1
+    return y_values
+
+  def put(self, tile: tuple, y_values: np.ndarray):
+    previous = self.tiles.pop(tile, None)
+    if previous is not None: self.size -= previous.nbytes
+    self.tiles[tile] = y_values
+    self.size += y_values.nbytes
+    self.evict()
+
+  def assemble(self, key: Hashable, group: Callable, min_x: float, max_x: float, N: int):
+    """
+    Returns (x, y) covering [min_x, max_x] with at least N intervals, taken from the cached tiles.
+    Missing tiles are computed by group(min_x, max_x, N) -> (x, y), called once per run of consecutive missing tiles.
+    """
+    level, step, first, last = tileSpan(min_x, max_x, N)
+    first_tile, last_tile = first // TILE_SAMPLES, last // TILE_SAMPLES
+
+    blocks: list[np.ndarray | None] = []
+    missing: list[int] = []
+    for index in range(first_tile, last_tile + 1):
+      y_values = self.get((key, level, index))
+      blocks.append(y_values)
+      if y_values is None: missing.append(index)
+
+    # Compute the missing tiles run by run
+    start = 0
+    while start < len(missing):
+      stop = start
+      while stop + 1 < len(missing) and missing[stop + 1] == missing[stop] + 1: stop += 1
+      begin, end = missing[start] * TILE_SAMPLES, (missing[stop] + 1) * TILE_SAMPLES
+      _, y_run = group(begin * step, (end - 1) * step, end - begin - 1)
+      for index in range(missing[start], missing[stop] + 1):
+        offset = (index - missing[start]) * TILE_SAMPLES
+        y_values = np.array(y_run[offset:offset + TILE_SAMPLES]) # A copy in the dtype of group, float32 tiles take half the budget
+        self.put((key, level, index), y_values)
+        blocks[index - first_tile] = y_values
+      start = stop + 1
+
+    y_values = np.concatenate(blocks)
+    offset = first - first_tile * TILE_SAMPLES
+    y_values = y_values[offset:offset + last - first + 1]
+    x_values = np.arange(first, last + 1, dtype=np.float64) * step
+    return x_values, y_values
+
+  def assembleSelfSimilar(self, key: Hashable, a: float, b: int, n: int, group: Callable, min_x: float, max_x: float, N: int):
+    """
+    Same as assemble on the b-adic grid of an integer b (see selfSimilarLevel), with tiles derived from their coarser level
+    when it is cached, and every stride-th sample returned so that the step stays close to the requested one.
+    group(origin, step, count) -> y evaluates the tiles that cannot be derived at the exact points origin + k * step (Fractions).
+    """
+    level = selfSimilarLevel(b, min_x, max_x, N)
+    if level is None: raise ValueError("The b-adic level of the view is out of range.")
+    period = b ** level
+    step = 2.0 / period
+    indices = selfSimilarIndices(level, step, min_x, max_x, N)
+    reduced = indices % period # W is 2-periodic
+
+    y_values = np.empty(len(indices))
+    for index in np.unique(reduced // TILE_SAMPLES).tolist():
+      tile = self.get((key, "b-adic", level, index))
+      if tile is None: tile = self.selfSimilarTile(key, a, b, n, group, level, index)
+      mask = reduced // TILE_SAMPLES == index
+      y_values[mask] = tile[reduced[mask] - index * TILE_SAMPLES]
+    return indices * step, y_values
+
+  def selfSimilarTile(self, key: Hashable, a: float, b: int, n: int, group: Callable, level: int, index: int):
+    # Computes and caches tile index of the b-adic level
+    period = b ** level
+    k = np.arange(index * TILE_SAMPLES, min((index + 1) * TILE_SAMPLES, period), dtype=np.int64)
+    coarse_period = b ** (level - 1) if level > 0 else 0
+    coarse = k % coarse_period if coarse_period else None
+    coarse_tiles = np.unique(coarse // TILE_SAMPLES).tolist() if coarse is not None else []
+
+    if coarse_tiles and all((key, "b-adic", level - 1, tile) in self.tiles for tile in coarse_tiles):
+      # W(x_k) = cos(pi x_k) + a W(b x_k) - a^(n+1) cos(b^(n+1) pi x_k), all the arguments reduced exactly
+      dtype = self.tiles[(key, "b-adic", level - 1, coarse_tiles[0])].dtype # float32 tiles stay float32
+      y_coarse = np.empty(len(k), dtype=dtype)
+      for tile in coarse_tiles:
+        mask = coarse // TILE_SAMPLES == tile
+        y_coarse[mask] = self.get((key, "b-adic", level - 1, tile))[coarse[mask] - tile * TILE_SAMPLES]
+      correction = a ** (n + 1)
+      if level > n + 1: # b^(n+1) pi x_k = 2 pi k / b^(level-n-1) is not a multiple of 2 pi
+        residue_period = b ** (level - n - 1)
+        correction = correction * np.cos(2.0 * math.pi * (k % residue_period) / residue_period)
+      y_values = (np.cos(2.0 * math.pi * k / period) + a * y_coarse - correction).astype(dtype, copy=False)
+      self.derived += 1
+    else:
+      # x_k = 2k / b^level held exactly, as a float64 x_k near 2 would lose the low bits b^i multiplies
+      y_values = np.array(group(Fraction(2 * int(k[0]), period), Fraction(2, period), len(k)))
+      self.direct += 1
+
+    self.put((key, "b-adic", level, index), y_values)
+    return y_values
+
+  def missingTiles(self, key: Hashable, min_x: float, max_x: float, N: int):
+    """
+    Returns the (level, index) of the tiles assemble would have to compute, without touching the statistics
+    """
+    level, _, first, last = tileSpan(min_x, max_x, N)
+    indices = range(first // TILE_SAMPLES, last // TILE_SAMPLES + 1)
+    return [(level, index) for index in indices if (key, level, index) not in self.tiles]
+
+  def missingSelfSimilarTiles(self, key: Hashable, b: int, min_x: float, max_x: float, N: int):
+    """
+    Returns the (level, index) of the b-adic tiles assembleSelfSimilar would have to compute, without touching the statistics
+    """
+    level = selfSimilarLevel(b, min_x, max_x, N)
+    if level is None: return []
+    period = b ** level
+    indices = np.unique(selfSimilarIndices(level, 2.0 / period, min_x, max_x, N) % period // TILE_SAMPLES).tolist()
+    return [(level, index) for index in indices if (key, "b-adic", level, index) not in self.tiles]
+
+  def prefetch(self, key: Hashable, group: Callable, level: int, index: int):
+    """
+    Computes one tile ahead of time, it is inserted as the least recently used so it is the first to go
+    """
+    tile = (key, level, index)
+    if tile in self.tiles: return
+    step = 2.0 ** level
+    begin = index * TILE_SAMPLES
+    _, y_values = group(begin * step, (begin + TILE_SAMPLES - 1) * step, TILE_SAMPLES - 1)
+    self.put(tile, np.array(y_values))
+    if tile in self.tiles: self.tiles.move_to_end(tile, last=False)
+    self.prefetched += 1
+
+  def prefetchSelfSimilar(self, key: Hashable, a: float, b: int, n: int, group: Callable, level: int, index: int):
+    """
+    Same as prefetch for a b-adic tile, derived from its coarser level when that is cached
+    """
+    tile = (key, "b-adic", level, index)
+    if tile in self.tiles: return
+    self.selfSimilarTile(key, a, b, n, group, level, index)
+    if tile in self.tiles: self.tiles.move_to_end(tile, last=False)
+    self.prefetched += 1
+
+  def stats(self):
+    lookups = self.hits + self.misses
+    return {
+      "tiles": len(self.tiles),
+      "memory": f"{self.size / (1 << 20):.2f} / {self.budget / (1 << 20):.2f} MB",
+      "hits": self.hits,
+      "misses": self.misses,
+      "hit rate": f"{100.0 * self.hits / lookups:.1f}%" if lookups else "n/a",
+      "evictions": self.evictions,
+      "prefetched": self.prefetched,
+      "self-similar derived": self.derived,
+      "self-similar direct": self.direct,
+    }
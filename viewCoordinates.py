@@ -0,0 +1,55 @@
+"""
+High-precision origin of the view, so that far translations and deep zooms do not jitter.
+
+The model keeps one exact origin per axis (a Fraction, ints, floats, Decimals and decimal strings convert exactly)
+and a float64 translation t in pixels relative to it. Sample arrays are stored relative to an origin of their own,
+so projecting them is float64 arithmetic on small numbers:
+  p = (x + float(line origin - view origin)) * pixels per unit + t
+Once t drifts past REBASE_PIXELS the origin absorbs it (rebase), which keeps t small.
+A zoom scales the origin with the units (rescale), so it keeps pivoting around x = 0 as if t were absolute.
+"""
+import math
+from fractions import Fraction
+
+# Largest translation, in pixels, kept in float64 before it is moved into the origin
+REBASE_PIXELS = 1 << 14
+# Bits of x that must be left to resolve the grid step for the samples to be computed in absolute float64
+ABSOLUTE_GRID_BITS = 40
+# The rescaled origin is rounded to 2^-SUBPIXEL_BITS pixels, which keeps its Fraction short
+SUBPIXEL_BITS = 20
+
+
+def rebase(origin: Fraction, t: float, pixels_per_unit: float):
+  """
+  Returns (origin, t) describing the same view, with t moved into the origin once |t| > REBASE_PIXELS.
+  The point x is drawn at (x - origin) * pixels_per_unit + t before and after.
+  """
+  if abs(t) <= REBASE_PIXELS or pixels_per_unit == 0: return origin, t
+  return origin - Fraction(t / pixels_per_unit), 0.0
+
+def rescale(origin: Fraction, old_scale: float, new_scale: float, pixels_per_unit: float):
+  """
+  Returns the origin after the units per window went from old_scale to new_scale, t unchanged:
+  x = 0 stays at the same pixel, like a zoom without origin, and every other point scales around it
+  """
+  if origin == 0 or old_scale == 0 or pixels_per_unit == 0: return origin
+  origin = origin * Fraction(new_scale) / Fraction(old_scale)
+  quantum = 2 ** (SUBPIXEL_BITS + max(0, math.ceil(math.log2(abs(pixels_per_unit)))))
+  return Fraction(round(origin * quantum), quantum)
+
+def shift(line_origin: Fraction, view_origin: Fraction):
+  """
+  Offset added to samples stored relative to line_origin to make them relative to view_origin
+  """
+  return float(line_origin - view_origin)
+
+def foldOrigin(origin: Fraction, min_x: float, max_x: float, N: int):
+  """
+  Returns (min_x, max_x, origin) for a grid of N intervals given relative to origin: absolute float64 bounds
+  with a zero origin when float64 still resolves the grid step there, the bounds relative to origin otherwise
+  """
+  if origin == 0: return min_x, max_x, Fraction(0)
+  absolute_min, absolute_max = float(origin + Fraction(min_x)), float(origin + Fraction(max_x))
+  extent = max(abs(absolute_min), abs(absolute_max))
+  if (max_x - min_x) / N >= extent * 2.0 ** -ABSOLUTE_GRID_BITS: return absolute_min, absolute_max, Fraction(0)
+  return min_x, max_x, origin
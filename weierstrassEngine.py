@@ -0,0 +1,582 @@
+"""
+In-process NumPy engine for the Weierstrass function.
+
+Mirrors the functions of Weierstrass.cpp so the viewer can compute samples without
+spawning bin/Weierstrass.exe:
+  random_a_b(a_p, b_p, range_p)
+  weierstrass(a, b, x, n)
+  weierstrassGroup(a, b, min_x, max_x, n, N)
+and weierstrassGroupCached, which keeps the cosine rows of the grid so a change of a costs no trig call,
+weierstrassGroupDeep, which reduces b^i * x modulo 2 exactly for views beyond float64 resolution,
+weierstrassGroupMode, which evaluates in float32 when that stays within an error budget,
+and weierstrassSweep, which evaluates many (a, b) pairs on one grid sharing the cosine rows of every b.
+
+Run as a script to write a whole (a, b) sweep to one .npy file (x row, then one row per pair, see saveSweep):
+  python weierstrassEngine.py --a 0.3 0.5 0.7 --b 3 5 7 --grid --n 20 --N 100000 --out sweep.npy
+"""
+import itertools
+import math
+import os
+import random
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from fractions import Fraction
+import numpy as np
+
+AB = 1 + (3.0 * math.pi) / 2
+
+# Largest number of float64 values held by one (terms x samples) cosine block
+CHUNK_SIZE = 1 << 21
+
+# Relative error allowed between P * step and a whole number of periods
+PERIOD_TOLERANCE = 1e-9
+# Largest number of periods spanned by the repeating block of samples
+MAX_PERIOD_MULTIPLE = 16
+
+# Default number of samples between two exact cos anchors of weierstrassGroupRecurrence
+RECURRENCE_ANCHOR = 64
+
+# Largest number of halvings of a pixel column by weierstrassEnvelope (up to 2^depth sub-intervals)
+ENVELOPE_MAX_DEPTH = 6
+
+# Memory allowed to the cached cosine rows of weierstrassGroupCached
+COSINE_CACHE_BUDGET = 256 << 20 # bytes
+# Grids remembered by CosineRowCache.repeats
+SEEN_GRIDS = 64
+
+# Fixed-point scale of the phases of weierstrassGroupDeep: 2^63 stands for 1, so uint64 arithmetic wraps modulo 2
+DEEP_PHASE_ONE = 1 << 63
+# Error of W due to the float64 rounding of b^i * pi * x above which deepZoomNeeded asks for weierstrassGroupDeep
+DEEP_ZOOM_ERROR = 1e-9
+# Bits of x left to resolve the grid step below which deepZoomNeeded asks for weierstrassGroupDeep
+DEEP_ZOOM_GRID_BITS = 40
+
+# Error allowed to the float32 evaluation mode, relative to sum |a|^i (the largest |W|)
+FLOAT32_ERROR_BUDGET = 1e-4
+FLOAT32_EPSILON = 2.0 ** -24
+
+
+def random_valid_b(min_b: int, max_b: int, rng: random.Random):
+  if min_b % 2 == 0: min_b += 1 # make min odd
+  if max_b % 2 == 0: max_b += 1 # make max odd
+
+  count = (max_b - min_b) // 2 + 1
+  return min_b + 2 * rng.randint(0, count - 1)
+
+def isUnset(value):
+  return value is None or value == "None"
+
+def random_a_b(a_p: str | float | None = None, b_p: str | float | None = None, range_p: str | float | None = None):
+  """
+  Same rules as random_a_b in Weierstrass.cpp, "None" (or None) leaves a parameter random.
+  Returns (a, b, range)
+  """
+  rng = random.Random()
+  a = rng.uniform(0.1, 0.9)
+  b = random_valid_b(1, 101, rng)
+  range_ = b
+
+  if not isUnset(a_p): a = float(a_p)
+  if not isUnset(b_p):
+    b = int(float(b_p))
+    range_ = b
+  if not isUnset(range_p):
+    r = int(float(range_p))
+    if r > 0: # Ensure range is positive
+      range_ = r
+      b = random_valid_b(1, range_, rng)
+
+  return (a, b, range_)
+
+def termCoefficients(a: float, b: float, n: int):
+  """
+  Returns (a^i, b^i * pi) for i = 0..n
+  """
+  i = np.arange(n + 1, dtype=np.float64)
+  return np.power(float(a), i), np.power(float(b), i) * math.pi
+
+def tailBound(a: float, n: int):
+  """
+  Upper bound of |sum_{i>n} a^i * cos(b^i * pi * x)|: |a|^(n+1) / (1 - |a|), infinite when |a| >= 1
+  """
+  a = abs(a)
+  if a >= 1: return math.inf
+  return a ** (n + 1) / (1 - a)
+
+def autoTerms(a: float, b: float, tolerance: float, step: float, max_n: int):
+  """
+  Smallest n whose tail bound is at most tolerance, capped at the Nyquist limit of a grid with this step
+  (the last term i with b^i * step <= 1, higher terms only alias) and at max_n.
+  """
+  a, b = abs(a), abs(b)
+  n = max_n
+  if a == 0: n = 0
+  elif a < 1 and tolerance > 0:
+    n = min(n, max(0, math.ceil(math.log(tolerance * (1 - a)) / math.log(a)) - 1))
+  if b > 1 and step > 0:
+    n = min(n, math.floor(math.log(1 / step) / math.log(b) + 1e-9))
+  return max(0, n)
+
+def gridX(min_x: float, max_x: float, N: int):
+  """
+  The N + 1 evenly spaced x values used by weierstrassGroup, both ends included
+  """
+  step = (max_x - min_x) / N
+  return min_x + np.arange(N + 1, dtype=np.float64) * step
+
+def weierstrass(a: float, b: float, x, n: int = 0):
+  """
+  W(a, b, x) = sum_{i=0}^{n} a^i * cos(b^i * pi * x), evaluated for every value of x at once.
+  The terms are batched as (terms x samples) cosine blocks of at most CHUNK_SIZE values.
+  """
+  if n < 0: raise ValueError("n must be non-negative.")
+  x = np.asarray(x, dtype=np.float64)
+  flat = x.reshape(-1)
+  y = np.empty_like(flat)
+  amplitudes, frequencies = termCoefficients(a, b, n)
+  step = max(1, CHUNK_SIZE // (n + 1))
+
+  for start in range(0, flat.size, step):
+    stop = start + step
+    y[start:stop] = amplitudes @ np.cos(np.multiply.outer(frequencies, flat[start:stop]))
+  return y.reshape(x.shape)
+
+def groupPeriod(b: float, min_x: float, max_x: float, N: int):
+  """
+  For an integer b every term cos(b^i * pi * x) has period 2, so W is 2-periodic.
+  Returns the number of samples P < N + 1 after which the grid of weierstrassGroup repeats modulo 2
+  (P * step is a whole number of periods), or None when b is not an integer or the grid never repeats.
+  An arbitrary grid practically never repeats, callers free to move the samples snap them with commensurateGrid.
+  """
+  if not float(b).is_integer(): return None
+  step = (max_x - min_x) / N
+  for multiple in range(1, MAX_PERIOD_MULTIPLE + 1):
+    span = 2.0 * multiple
+    period = round(span / step)
+    if period <= 0: continue
+    if period > N: return None
+    if abs(period * step - span) <= PERIOD_TOLERANCE * span: return period
+  return None
+
+def commensurateGrid(b: float, min_x: float, max_x: float, N: int):
+  """
+  Returns (min_x, max_x, N) with the step shrunk to 2 / P for a whole P and max_x moved to keep [min_x, max_x] covered,
+  so that groupPeriod finds the period P. Only done for an integer b, a grid spanning more than one period
+  and a step below 2 (so N at most doubles), the grid is returned unchanged otherwise.
+  """
+  if not float(b).is_integer() or max_x - min_x <= 2.0 or max_x - min_x >= 2.0 * N: return min_x, max_x, N
+  period = math.ceil(2.0 * N / (max_x - min_x))
+  step = 2.0 / period
+  N = math.ceil((max_x - min_x) / step - 1e-9)
+  return min_x, min_x + N * step, N
+
+def tilePeriod(y_period: np.ndarray, count: int):
+  """
+  Repeats the samples of one period to count samples, y[k] = y_period[k mod P]
+  """
+  return np.resize(y_period, count)
+
+def addTerm(y: np.ndarray, x: np.ndarray, a: float, b: float, i: int):
+  """
+  y += a^i * cos(b^i * pi * x) in place, turning the partial sum S_(i-1) held in y into S_i.
+  The term goes through a scratch buffer of at most CHUNK_SIZE values.
+  """
+  amplitude = float(a) ** i
+  frequency = float(b) ** i * math.pi
+  scratch = np.empty(min(CHUNK_SIZE, y.size))
+  for start in range(0, y.size, CHUNK_SIZE):
+    stop = min(start + CHUNK_SIZE, y.size)
+    term = scratch[:stop - start]
+    np.multiply(x[start:stop], frequency, out=term)
+    np.cos(term, out=term)
+    term *= amplitude
+    y[start:stop] += term
+  return y
+
+def weierstrassGroup(a: float, b: float, min_x: float, max_x: float, n: int = 0, N: int = 100):
+  """
+  Generates N + 1 points in the range [min_x, max_x].
+  For an integer b only the first period of the grid is evaluated, the rest is tiled (see groupPeriod).
+  Returns the float64 arrays (x, y).
+  """
+  if N <= 0 or n < 0: raise ValueError("n must be non-negative and N must be positive.")
+  if min_x >= max_x: raise ValueError("min_x must be less than max_x.")
+
+  x = gridX(min_x, max_x, N)
+  period = groupPeriod(b, min_x, max_x, N)
+  if period is not None: return x, tilePeriod(weierstrass(a, b, x[:period], n), N + 1)
+  return x, weierstrass(a, b, x, n)
+
+def weierstrassGroupRecurrence(a: float, b: float, min_x: float, max_x: float, n: int = 0, N: int = 100, anchor: int = RECURRENCE_ANCHOR):
+  """
+  Same contract as weierstrassGroup without a cos call per sample: along the grid every term satisfies
+  cos((k + 1) * theta) = 2 cos(theta) cos(k * theta) - cos((k - 1) * theta), theta = b^i * pi * step.
+  The grid is cut in runs of anchor samples starting from exact cos values, all the runs and terms advance together.
+  """
+  if N <= 0 or n < 0: raise ValueError("n must be non-negative and N must be positive.")
+  if min_x >= max_x: raise ValueError("min_x must be less than max_x.")
+  anchor = max(2, anchor)
+
+  x = gridX(min_x, max_x, N)
+  step = (max_x - min_x) / N
+  amplitudes, frequencies = termCoefficients(a, b, n)
+  starts = x[::anchor]
+  previous = np.cos(np.multiply.outer(frequencies, starts)) # (terms x runs)
+  current = np.cos(np.multiply.outer(frequencies, starts + step))
+  two_cos = (2.0 * np.cos(frequencies * step))[:, None]
+
+  y = np.empty((anchor, len(starts)))
+  y[0] = amplitudes @ previous
+  y[1] = amplitudes @ current
+  for k in range(2, anchor):
+    previous, current = current, two_cos * current - previous
+    y[k] = amplitudes @ current
+  return x, y.T.reshape(-1)[:N + 1]
+
+def deepZoomNeeded(a: float, b: float, n: int, min_x: float, max_x: float, N: int, origin=0):
+  """
+  True when float64 cannot evaluate the grid any more: the rounding of the arguments b^i * pi * x moves W
+  by more than DEEP_ZOOM_ERROR, or the grid step falls below the resolution of x
+  """
+  extent = abs(float(origin)) + max(abs(min_x), abs(max_x))
+  if extent == 0: return False
+  growth = n * max(0.0, math.log(abs(a) * abs(b))) if a != 0 and b != 0 else 0.0 # largest a^i * b^i, logarithm
+  log_error = growth + math.log(math.pi * extent) - 53 * math.log(2.0)
+  return log_error > math.log(DEEP_ZOOM_ERROR) or (max_x - min_x) / N < extent * 2.0 ** -DEEP_ZOOM_GRID_BITS
+
+def fixedPhase(value: Fraction):
+  # value mod 2 as a uint64 fixed-point phase
+  return round((value % 2) * DEEP_PHASE_ONE) % (1 << 64)
+
+def deepPhases(b: float, x0, step, n: int):
+  """
+  Exact reduction of every argument along the grid x_k = x0 + k * step: b^i * x_k = start_i + k * increment_i (mod 2).
+  x0 and step are taken exactly (int, float, str, Decimal or Fraction). For an integer b the residues modulo 2 are
+  carried from one term to the next by one multiplication, otherwise b^i is expanded exactly.
+  Returns the uint64 fixed-point arrays (start, increment) of the n + 1 terms, see DEEP_PHASE_ONE.
+  """
+  b, x0, step = Fraction(b), Fraction(x0), Fraction(step)
+  starts = np.empty(n + 1, dtype=np.uint64)
+  increments = np.empty(n + 1, dtype=np.uint64)
+  if b.denominator == 1:
+    for i in range(n + 1):
+      x0, step = x0 % 2, step % 2
+      starts[i], increments[i] = fixedPhase(x0), fixedPhase(step)
+      x0, step = x0 * b, step * b
+  else:
+    for i in range(n + 1):
+      power = b ** i
+      starts[i], increments[i] = fixedPhase(power * x0), fixedPhase(power * step)
+  return starts, increments
+
+def deepGridPhases(b: float, min_x: float, max_x: float, n: int, N: int, origin=0):
+  """
+  deepPhases of the grid of weierstrassGroupDeep, origin + min_x + k * (max_x - min_x) / N
+  """
+  return deepPhases(b, Fraction(origin) + Fraction(min_x), (max_x - min_x) / N, n)
+
+def deepSum(amplitudes: np.ndarray, starts: np.ndarray, increments: np.ndarray, count: int):
+  """
+  y_k = sum_i amplitudes_i * cos(pi * (start_i + k * increment_i)) for k = 0..count-1, the phases wrapping in uint64
+  """
+  y = np.empty(count)
+  step = max(1, CHUNK_SIZE // len(amplitudes))
+  for first in range(0, count, step):
+    k = np.arange(first, min(first + step, count), dtype=np.uint64)
+    phases = starts[:, None] + np.multiply.outer(increments, k) # (terms x samples), wraps modulo 2
+    y[first:first + len(k)] = amplitudes @ np.cos(phases.view(np.int64) * (math.pi / DEEP_PHASE_ONE))
+  return y
+
+def weierstrassGroupDeep(a: float, b: float, min_x: float, max_x: float, n: int = 0, N: int = 100, origin=0):
+  """
+  Same contract as weierstrassGroup for deep zooms: the grid is origin + min_x + k * step with origin held exactly,
+  and b^i * x is reduced modulo 2 with integer arithmetic (see deepPhases) before the only float64 operation, the cos.
+  min_x and max_x may be Fractions too, the grid is then exact. Returns (x, y) with x relative to origin.
+  """
+  if N <= 0 or n < 0: raise ValueError("n must be non-negative and N must be positive.")
+  if min_x >= max_x: raise ValueError("min_x must be less than max_x.")
+  starts, increments = deepGridPhases(b, min_x, max_x, n, N, origin)
+  amplitudes = np.power(float(a), np.arange(n + 1, dtype=np.float64))
+  return gridX(float(min_x), float(max_x), N), deepSum(amplitudes, starts, increments, N + 1)
+
+def float32Error(a: float, b: float, n: int, min_x: float, max_x: float):
+  """
+  Estimated error of the float32 evaluation relative to sum |a|^i. The rounding of the argument b^i * pi * x
+  moves term i by up to |a|^i * b^i * pi * |x| * epsilon, the cos and the sum add about one epsilon per term.
+  """
+  a, b = abs(a), abs(b)
+  if a == 0: return FLOAT32_EPSILON
+  extent = max(abs(min_x), abs(max_x))
+  i = np.arange(n + 1, dtype=np.float64)
+  with np.errstate(over="ignore"):
+    argument_error = float(np.sum(np.power(a * b, i))) * math.pi * extent
+  return FLOAT32_EPSILON * (argument_error / float(np.sum(np.power(a, i))) + n + 2)
+
+def evaluationMode(a: float, b: float, n: int, min_x: float, max_x: float, float32: bool = True, budget: float = FLOAT32_ERROR_BUDGET):
+  """
+  "float32" when float32 is asked for and float32Error stays within budget, "float64" otherwise
+  """
+  if float32 and float32Error(a, b, n, min_x, max_x) <= budget: return "float32"
+  return "float64"
+
+def weierstrassGroupFloat32(a: float, b: float, min_x: float, max_x: float, n: int = 0, N: int = 100):
+  """
+  weierstrassGroup in float32: half the memory per sample and twice the values per SIMD register.
+  Returns the float32 arrays (x, y), see float32Error for their accuracy.
+  """
+  if N <= 0 or n < 0: raise ValueError("n must be non-negative and N must be positive.")
+  if min_x >= max_x: raise ValueError("min_x must be less than max_x.")
+  x = gridX(min_x, max_x, N).astype(np.float32)
+  amplitudes, frequencies = (values.astype(np.float32) for values in termCoefficients(a, b, n))
+  y = np.empty(N + 1, dtype=np.float32)
+  step = max(1, CHUNK_SIZE // (n + 1))
+  for start in range(0, N + 1, step):
+    stop = start + step
+    y[start:stop] = amplitudes @ np.cos(np.multiply.outer(frequencies, x[start:stop]))
+  return x, y
+
+def weierstrassGroupMode(a: float, b: float, min_x: float, max_x: float, n: int = 0, N: int = 100, float32: bool = True, budget: float = FLOAT32_ERROR_BUDGET):
+  """
+  weierstrassGroup in float32 when float32 is asked for and evaluationMode allows it, in float64 otherwise.
+  Returns (x, y, mode), mode being the one actually used.
+  """
+  mode = evaluationMode(a, b, n, min_x, max_x, float32, budget)
+  if mode == "float32": return (*weierstrassGroupFloat32(a, b, min_x, max_x, n, N), mode)
+  return (*weierstrassGroup(a, b, min_x, max_x, n, N), mode)
+
+def weierstrassSweep(a_values, b_values, x, n: int = 0, threads: int = 0):
+  """
+  W(a_j, b_j, x_k) for every pair j of the arrays a_values and b_values and every value of x, as a (pairs x samples) block.
+  The pairs are grouped by b, so the cosine rows cos(b^i * pi * x) of a b are computed once and every a costs
+  a dot product. The samples are cut in chunks of at most CHUNK_SIZE cosines evaluated by threads
+  (threads <= 0: one per CPU), NumPy releases the GIL in cos and matmul.
+  """
+  if n < 0: raise ValueError("n must be non-negative.")
+  a_values = np.asarray(a_values, dtype=np.float64).reshape(-1)
+  b_values = np.asarray(b_values, dtype=np.float64).reshape(-1)
+  if a_values.shape != b_values.shape: raise ValueError("a_values and b_values must hold the same number of values.")
+  x = np.asarray(x, dtype=np.float64).reshape(-1)
+  y = np.empty((len(a_values), len(x)))
+  if y.size == 0: return y
+
+  exponents = np.arange(n + 1, dtype=np.float64)
+  groups = []
+  for b in np.unique(b_values):
+    rows = np.flatnonzero(b_values == b)
+    amplitudes = np.power.outer(a_values[rows], exponents) # (pairs of this b x terms)
+    groups.append((rows, amplitudes, np.power(b, exponents) * math.pi))
+
+  def sweepChunk(start: int, stop: int):
+    for rows, amplitudes, frequencies in groups:
+      y[rows, start:stop] = amplitudes @ np.cos(np.multiply.outer(frequencies, x[start:stop]))
+
+  step = max(1, CHUNK_SIZE // (n + 1))
+  chunks = [(start, min(start + step, len(x))) for start in range(0, len(x), step)]
+  threads = threads if threads > 0 else (os.cpu_count() or 1)
+  if threads == 1 or len(chunks) == 1:
+    for chunk in chunks: sweepChunk(*chunk)
+  else:
+    with ThreadPoolExecutor(max_workers=min(threads, len(chunks))) as executor:
+      list(executor.map(lambda chunk: sweepChunk(*chunk), chunks))
+  return y
+
+def saveSweep(a_values: list[float], b_values: list[float], n: int, min_x: float, max_x: float, N: int, grid: bool, path: str, threads: int = 0):
+  """
+  Writes the (pairs + 1, N + 1) float64 block [x, W(a_0, b_0, x), W(a_1, b_1, x), ...] to path, returns the pairs.
+  With grid every (a, b) combination is a pair, otherwise a_values and b_values are zipped.
+  """
+  pairs = list(itertools.product(a_values, b_values)) if grid else list(zip(a_values, b_values, strict=True))
+  x_values = gridX(min_x, max_x, N)
+  block = np.empty((len(pairs) + 1, N + 1))
+  block[0] = x_values
+  block[1:] = weierstrassSweep([a for a, _ in pairs], [b for _, b in pairs], x_values, n, threads)
+  np.save(path, block)
+  return pairs
+
+def termBounds(amplitudes: np.ndarray, frequencies: np.ndarray, x_start: np.ndarray, x_stop: np.ndarray, cos_start: np.ndarray, cos_stop: np.ndarray):
+  """
+  Rigorous (lower, upper) of sum_i amplitudes[i] * cos(frequencies[i] * x) over every interval [x_start, x_stop],
+  bounding every term by the exact range of its cosine over the interval.
+  cos_start and cos_stop are the (terms x intervals) cosines at both ends.
+  """
+  theta_start = np.multiply.outer(frequencies, x_start)
+  theta_stop = np.multiply.outer(frequencies, x_stop)
+  high = np.maximum(cos_start, cos_stop)
+  low = np.minimum(cos_start, cos_stop)
+  two_pi = 2.0 * math.pi
+  high = np.where(np.ceil(theta_start / two_pi) * two_pi <= theta_stop, 1.0, high) # A multiple of 2 pi inside
+  low = np.where(np.ceil((theta_start - math.pi) / two_pi) * two_pi + math.pi <= theta_stop, -1.0, low) # An odd multiple of pi inside
+  amplitudes = amplitudes[:, None]
+  lower = np.where(amplitudes >= 0, amplitudes * low, amplitudes * high).sum(axis=0)
+  upper = np.where(amplitudes >= 0, amplitudes * high, amplitudes * low).sum(axis=0)
+  return lower, upper
+
+def weierstrassEnvelope(a: float, b: float, min_x: float, max_x: float, columns: int, n: int = 0, tolerance: float = 1e-3, max_depth: int = ENVELOPE_MAX_DEPTH):
+  """
+  Rigorous min/max bounds of W (n terms) over each of the columns equal slices of [min_x, max_x].
+  The partial sum is only evaluated up to the first m terms whose remaining tail sum_{m<i<=n} |a|^i
+  is at most tolerance / 2, the tail is added to the bounds as is.
+  Every column starts as a single interval bounded term by term, the values at the interval ends give an inner bound;
+  the columns whose outer bound exceeds the inner one by more than tolerance are halved again, up to max_depth times.
+  Returns (x, lower, upper, evaluations): the column centers, the bounds and the number of points evaluated.
+  """
+  if columns <= 0 or n < 0: raise ValueError("n must be non-negative and the number of columns must be positive.")
+  if min_x >= max_x: raise ValueError("min_x must be less than max_x.")
+
+  amplitudes, frequencies = termCoefficients(a, b, n)
+  tails = np.concatenate((np.cumsum(np.abs(amplitudes)[::-1])[::-1][1:], [0.0])) # tails[m] = sum_{m<i<=n} |a|^i
+  m = int(np.argmax(tails <= tolerance / 2))
+  tail = tails[m]
+  amplitudes, frequencies = amplitudes[:m + 1], np.abs(frequencies[:m + 1]) # cos is even
+  edges = np.linspace(min_x, max_x, columns + 1)
+  lower = np.empty(columns)
+  upper = np.empty(columns)
+  active = np.arange(columns)
+  evaluations = 0
+
+  for depth in range(max_depth + 1):
+    parts = 1 << depth
+    left = edges[active]
+    width = edges[active + 1] - left
+    points = left[:, None] + width[:, None] * (np.arange(parts + 1) / parts) # (columns x parts + 1)
+    cosines = np.cos(np.multiply.outer(frequencies, points)) # (terms x columns x parts + 1)
+    values = np.tensordot(amplitudes, cosines, axes=1)
+    evaluations += values.size
+
+    part_lower, part_upper = termBounds(
+      amplitudes, frequencies, points[:, :-1].ravel(), points[:, 1:].ravel(),
+      cosines[:, :, :-1].reshape(len(frequencies), -1), cosines[:, :, 1:].reshape(len(frequencies), -1)
+    )
+    outer_lower = part_lower.reshape(len(active), parts).min(axis=1)
+    outer_upper = part_upper.reshape(len(active), parts).max(axis=1)
+    lower[active] = outer_lower - tail
+    upper[active] = outer_upper + tail
+
+    gap = (outer_upper - values.max(axis=1)) + (values.min(axis=1) - outer_lower)
+    active = active[gap > tolerance]
+    if active.size == 0: break
+
+  return (edges[:-1] + edges[1:]) / 2, lower, upper, evaluations
+
+class CosineRowCache():
+  """
+  Cosine rows C[i, k] = cos(b^i * pi * x_k) of recently used grids, so that W = (a^i) @ C.
+  A grid is keyed by (b, min_x, max_x, N), only its first period is kept when b is an integer.
+  Rows are added when n grows and sliced when it shrinks, grids are evicted least recently used first.
+  Rows only pay off for a grid evaluated again, repeats tells whether a grid has been asked for before.
+  """
+  def __init__(self, budget: int = COSINE_CACHE_BUDGET):
+    self.budget = budget
+    self.grids: OrderedDict[tuple, np.ndarray] = OrderedDict() # {(b, min_x, max_x, N): rows}, oldest first
+    self.size = 0 # bytes held by the rows
+    self.hits = 0 # Evaluations without any trig call
+    self.misses = 0 # Evaluations that had to compute rows
+    self.rows_computed = 0
+    self.seen: OrderedDict[tuple, None] = OrderedDict() # Keys of the last SEEN_GRIDS grids asked for
+
+  def repeats(self, b: float, min_x: float, max_x: float, N: int):
+    """
+    Returns whether the grid (b, min_x, max_x, N) has rows or was asked for recently, and records it
+    """
+    key = (float(b), float(min_x), float(max_x), int(N))
+    if key in self.grids: return True
+    repeated = key in self.seen
+    self.seen[key] = None
+    self.seen.move_to_end(key)
+    while len(self.seen) > SEEN_GRIDS: self.seen.popitem(last=False)
+    return repeated
+
+  def setBudget(self, budget: int):
+    self.budget = budget
+    self.evict()
+
+  def evict(self, keep: tuple | None = None):
+    for key in list(self.grids):
+      if self.size <= self.budget: break
+      if key == keep: continue
+      self.size -= self.grids.pop(key).nbytes
+
+  def clear(self):
+    self.grids.clear()
+    self.seen.clear()
+    self.size = 0
+
+  def fits(self, terms: int, samples: int):
+    return terms * samples * 8 <= self.budget
+
+  def rows(self, b: float, min_x: float, max_x: float, N: int, x: np.ndarray, n: int):
+    """
+    Returns the n + 1 cosine rows of the samples x of the grid (b, min_x, max_x, N)
+    """
+    key = (float(b), float(min_x), float(max_x), int(N))
+    rows = self.grids.pop(key, None)
+    if rows is not None and len(rows) > n:
+      self.grids[key] = rows
+      self.hits += 1
+      return rows[:n + 1]
+
+    self.misses += 1
+    start = 0 if rows is None else len(rows)
+    _, frequencies = termCoefficients(1.0, b, n)
+    new_rows = np.cos(np.multiply.outer(frequencies[start:], x))
+    self.rows_computed += len(new_rows)
+    if rows is not None:
+      self.size -= rows.nbytes
+      new_rows = np.concatenate((rows, new_rows))
+    self.grids[key] = new_rows
+    self.size += new_rows.nbytes
+    self.evict(keep=key)
+    return new_rows
+
+  def stats(self):
+    return {
+      "grids": len(self.grids),
+      "rows": sum(len(rows) for rows in self.grids.values()),
+      "memory": f"{self.size / (1 << 20):.2f} / {self.budget / (1 << 20):.2f} MB",
+      "hits": self.hits,
+      "misses": self.misses,
+      "rows computed": self.rows_computed,
+    }
+
+COSINE_ROWS = CosineRowCache()
+
+def weierstrassGroupCached(a: float, b: float, min_x: float, max_x: float, n: int = 0, N: int = 100, cache: CosineRowCache = COSINE_ROWS):
+  """
+  Same contract as weierstrassGroup. The cosine rows of the grid are kept in cache, so evaluating
+  the same grid again with another a (or a smaller n) is a single dot product without trig calls.
+  Falls back to the chunked weierstrassGroup when the rows would not fit in the cache budget.
+  """
+  if N <= 0 or n < 0: raise ValueError("n must be non-negative and N must be positive.")
+  if min_x >= max_x: raise ValueError("min_x must be less than max_x.")
+
+  period = groupPeriod(b, min_x, max_x, N)
+  samples = N + 1 if period is None else period
+  if not cache.fits(n + 1, samples): return weierstrassGroup(a, b, min_x, max_x, n, N)
+
+  x = gridX(min_x, max_x, N)
+  amplitudes, _ = termCoefficients(a, b, n)
+  y = amplitudes @ cache.rows(b, min_x, max_x, N, x[:samples], n)
+  if period is not None: y = tilePeriod(y, N + 1)
+  return x, y
+
+
+def main():
+  import argparse
+  parser = argparse.ArgumentParser(description="Evaluate many (a, b) pairs on one grid and write them to a .npy file.")
+  parser.add_argument("--a", type=float, nargs="+", required=True)
+  parser.add_argument("--b", type=float, nargs="+", required=True)
+  parser.add_argument("--grid", action="store_true", help="every (a, b) combination instead of zipped pairs")
+  parser.add_argument("--n", type=int, default=20)
+  parser.add_argument("--min-x", type=float, default=-2.0)
+  parser.add_argument("--max-x", type=float, default=2.0)
+  parser.add_argument("--N", type=int, default=100)
+  parser.add_argument("--threads", type=int, default=0, help="0 uses one thread per CPU")
+  parser.add_argument("--out", required=True, help="output .npy file")
+  args = parser.parse_args()
+
+  if not args.grid and len(args.a) != len(args.b): parser.error("needs as many --a as --b values, or --grid.")
+  pairs = saveSweep(args.a, args.b, args.n, args.min_x, args.max_x, args.N, args.grid, args.out, args.threads)
+  print(f"Wrote {len(pairs)} pairs of {args.N + 1} samples to {args.out}.")
+
+if __name__ == "__main__":
+  main()
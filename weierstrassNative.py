@@ -0,0 +1,272 @@
+"""
+ctypes binding for the native Weierstrass library built from _Weierstrass.cpp
+(bin/libWeierstrass.so on Linux, bin/Weierstrass.dll on Windows, see the Makefile),
+and reader for the binary output of the Weierstrass executable built from Weierstrass.cpp.
+
+weierstrassGroup_into writes into caller owned NumPy buffers, so no array is allocated
+by the library and nothing has to be released with freeDblPointer.
+"""
+import ctypes
+import os
+import sys
+import numpy as np
+import weierstrassEngine
+
+BIN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bin")
+
+# Error codes returned by the buffer based functions (see _Weierstrass.cpp)
+WEIERSTRASS_ERR_ARGS = -1
+WEIERSTRASS_ERR_BUFFER = -2
+
+# Header of the executable's --binary output, followed by N + 1 little-endian float64 (x, y) pairs
+BINARY_MAGIC = b"WEIERF64"
+BINARY_HEADER = np.dtype([
+  ("magic", "S8"), ("N", "<i8"), ("n", "<i8"),
+  ("a", "<f8"), ("b", "<f8"), ("range", "<f8"), ("min_x", "<f8"), ("max_x", "<f8")
+])
+
+# Functions the bindings need, a library built from an older _Weierstrass.cpp lacks some of them
+REQUIRED_EXPORTS = (
+  "random_a_b", "weierstrass", "freeDblPointer", "weierstrassGroupLength", "weierstrassGroup_into",
+  "weierstrassGroupParallel_into", "weierstrassGroupRecurrence_into", "weierstrassGroupDeep_into",
+  "weierstrassGroupFloat_into", "weierstrassKernelName",
+)
+
+DoubleBuffer = np.ctypeslib.ndpointer(dtype=np.float64, ndim=1, flags="C_CONTIGUOUS,WRITEABLE")
+DoubleArray = np.ctypeslib.ndpointer(dtype=np.float64, ndim=1, flags="C_CONTIGUOUS")
+PhaseArray = np.ctypeslib.ndpointer(dtype=np.uint64, ndim=1, flags="C_CONTIGUOUS")
+FloatBuffer = np.ctypeslib.ndpointer(dtype=np.float32, ndim=1, flags="C_CONTIGUOUS,WRITEABLE")
+
+_lib: ctypes.CDLL | None = None
+
+
+def libraryPath():
+  if sys.platform == "win32": return os.path.join(BIN_DIR, "Weierstrass.dll")
+  return os.path.join(BIN_DIR, "libWeierstrass.so")
+
+def executablePath():
+  if sys.platform == "win32": return os.path.join(BIN_DIR, "Weierstrass.exe")
+  return os.path.join(BIN_DIR, "Weierstrass")
+
+class GroupBinaryStream():
+  """
+  Incremental reader of the --binary output, fed with stdout chunks as they arrive.
+  Complete (x, y) records are copied into arrays allocated once the header is known.
+  """
+  def __init__(self):
+    self.pending = bytearray()
+    self.header: dict | None = None
+    self.pairs = np.empty((0, 2), dtype=np.float64)
+    self.count = 0
+
+  def feed(self, chunk: bytes):
+    """
+    Returns the number of new (x, y) records
+    """
+    self.pending += chunk
+    if self.header is None:
+      if len(self.pending) < BINARY_HEADER.itemsize: return 0
+      record = np.frombuffer(bytes(self.pending[:BINARY_HEADER.itemsize]), dtype=BINARY_HEADER)[0]
+      if record["magic"] != BINARY_MAGIC:
+        raise ValueError("The output is not in the Weierstrass binary format.")
+      self.header = {name: record[name].item() for name in BINARY_HEADER.names if name != "magic"}
+      self.pairs = np.empty((self.header["N"] + 1, 2), dtype=np.float64)
+      del self.pending[:BINARY_HEADER.itemsize]
+
+    new = min(len(self.pending) // 16, len(self.pairs) - self.count)
+    if new > 0:
+      self.pairs[self.count:self.count + new] = np.frombuffer(self.pending, dtype="<f8", count=new * 2).reshape(new, 2)
+      del self.pending[:new * 16]
+      self.count += new
+    return new
+
+  def isComplete(self):
+    return self.header is not None and self.count == len(self.pairs)
+
+  def samples(self):
+    """
+    Returns (x, y) views of the records read so far
+    """
+    return self.pairs[:self.count, 0], self.pairs[:self.count, 1]
+
+def loadLibrary(path: str | None = None):
+  """
+  Loads the native library once and declares the signatures of its exported functions.
+  Raises OSError when the library has not been built or is stale (missing one of REQUIRED_EXPORTS).
+  """
+  global _lib
+  if _lib is not None and path is None: return _lib
+
+  lib = ctypes.CDLL(path or libraryPath())
+  missing = [name for name in REQUIRED_EXPORTS if not hasattr(lib, name)]
+  if missing: raise OSError(f"The native library is out of date (missing {', '.join(missing)}), rebuild it with make.")
+
+  lib.random_a_b.argtypes = [ctypes.POINTER(ctypes.c_double), ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int)]
+  lib.random_a_b.restype = ctypes.POINTER(ctypes.c_double)
+  lib.weierstrass.argtypes = [ctypes.c_double, ctypes.c_double, ctypes.c_double, ctypes.c_int]
+  lib.weierstrass.restype = ctypes.c_double
+  lib.freeDblPointer.argtypes = [ctypes.POINTER(ctypes.c_double)]
+  lib.freeDblPointer.restype = None
+  lib.weierstrassGroupLength.argtypes = [ctypes.c_int]
+  lib.weierstrassGroupLength.restype = ctypes.c_int
+  lib.weierstrassGroup_into.argtypes = [
+    ctypes.c_double, ctypes.c_double, ctypes.c_double, ctypes.c_double, ctypes.c_int, ctypes.c_int,
+    DoubleBuffer, DoubleBuffer, ctypes.c_int
+  ]
+  lib.weierstrassGroup_into.restype = ctypes.c_int
+  lib.weierstrassGroupParallel_into.argtypes = lib.weierstrassGroup_into.argtypes + [ctypes.c_int]
+  lib.weierstrassGroupParallel_into.restype = ctypes.c_int
+  lib.weierstrassGroupRecurrence_into.argtypes = lib.weierstrassGroupParallel_into.argtypes + [ctypes.c_int]
+  lib.weierstrassGroupRecurrence_into.restype = ctypes.c_int
+  lib.weierstrassGroupDeep_into.argtypes = [
+    DoubleArray, PhaseArray, PhaseArray, ctypes.c_int, ctypes.c_int, DoubleBuffer, ctypes.c_int, ctypes.c_int
+  ]
+  lib.weierstrassGroupDeep_into.restype = ctypes.c_int
+  lib.weierstrassGroupFloat_into.argtypes = [
+    ctypes.c_double, ctypes.c_double, ctypes.c_double, ctypes.c_double, ctypes.c_int, ctypes.c_int,
+    FloatBuffer, FloatBuffer, ctypes.c_int, ctypes.c_int
+  ]
+  lib.weierstrassGroupFloat_into.restype = ctypes.c_int
+  lib.weierstrassKernelName.argtypes = []
+  lib.weierstrassKernelName.restype = ctypes.c_char_p
+
+  _lib = lib
+  return lib
+
+def isAvailable():
+  try:
+    loadLibrary()
+  except OSError:
+    return False
+  return True
+
+def groupLength(N: int):
+  """
+  Length both output buffers of weierstrassGroupInto must have: N + 1
+  """
+  if N <= 0: raise ValueError("N must be positive.")
+  length = N + 1
+  if loadLibrary().weierstrassGroupLength(N) != length:
+    raise RuntimeError("The native library does not agree on the weierstrassGroup_into buffer length.")
+  return length
+
+def checkBuffer(buffer, length: int, name: str):
+  if not isinstance(buffer, np.ndarray) or buffer.dtype != np.float64 or buffer.ndim != 1:
+    raise TypeError(f"{name} must be a one dimensional float64 NumPy array.")
+  if not buffer.flags.c_contiguous or not buffer.flags.writeable:
+    raise ValueError(f"{name} must be C contiguous and writeable.")
+  if buffer.size != length:
+    raise ValueError(f"{name} holds {buffer.size} values, weierstrassGroup_into needs exactly {length}.")
+
+def random_a_b(a_p: float | None = None, b_p: int | None = None, range_p: int | None = None):
+  """
+  Returns (a, b, range) from the native random_a_b, None leaves a parameter random.
+  """
+  lib = loadLibrary()
+  a_arg = ctypes.byref(ctypes.c_double(a_p)) if a_p is not None else None
+  b_arg = ctypes.byref(ctypes.c_int(int(b_p))) if b_p is not None else None
+  range_arg = ctypes.byref(ctypes.c_int(int(range_p))) if range_p is not None else None
+
+  arr = lib.random_a_b(a_arg, b_arg, range_arg)
+  try:
+    return (arr[0], int(arr[1]), int(arr[2]))
+  finally:
+    lib.freeDblPointer(arr)
+
+def weierstrass(a: float, b: float, x: float, n: int = 0):
+  return loadLibrary().weierstrass(a, b, x, n)
+
+def weierstrassGroupInto(a: float, b: float, min_x: float, max_x: float, n: int, N: int, x_out: np.ndarray, y_out: np.ndarray, threads: int = 1):
+  """
+  Fills x_out and y_out, each of length groupLength(N), with the N + 1 points in [min_x, max_x],
+  splitting the x range across threads (threads <= 0: one per hardware thread).
+  Returns the number of points written.
+  """
+  if n < 0: raise ValueError("n must be non-negative and N must be positive.")
+  if min_x >= max_x: raise ValueError("min_x must be less than max_x.")
+  length = groupLength(N)
+  checkBuffer(x_out, length, "x_out")
+  checkBuffer(y_out, length, "y_out")
+
+  written = loadLibrary().weierstrassGroupParallel_into(a, b, min_x, max_x, n, N, x_out, y_out, length, threads)
+  if written == WEIERSTRASS_ERR_ARGS: raise ValueError("The native library rejected the Weierstrass parameters.")
+  if written == WEIERSTRASS_ERR_BUFFER: raise ValueError("The native library rejected the output buffers.")
+  return written
+
+def weierstrassGroupRecurrence(a: float, b: float, min_x: float, max_x: float, n: int = 0, N: int = 100, threads: int = 0, anchor: int = 0):
+  """
+  Same contract as weierstrassGroup, computed with the trig-free recurrence kernel
+  re-anchored with exact cos values every anchor points (anchor <= 0: the library default, 64).
+  """
+  if n < 0 or N <= 0: raise ValueError("n must be non-negative and N must be positive.")
+  if min_x >= max_x: raise ValueError("min_x must be less than max_x.")
+  length = groupLength(N)
+  x_values = np.empty(length, dtype=np.float64)
+  y_values = np.empty(length, dtype=np.float64)
+
+  written = loadLibrary().weierstrassGroupRecurrence_into(a, b, min_x, max_x, n, N, x_values, y_values, length, threads, anchor)
+  if written == WEIERSTRASS_ERR_ARGS: raise ValueError("The native library rejected the Weierstrass parameters.")
+  if written == WEIERSTRASS_ERR_BUFFER: raise ValueError("The native library rejected the output buffers.")
+  return x_values, y_values
+
+def weierstrassGroupDeep(a: float, b: float, min_x: float, max_x: float, n: int = 0, N: int = 100, origin=0, threads: int = 0):
+  """
+  Same contract as weierstrassEngine.weierstrassGroupDeep: the phases are reduced exactly in Python,
+  the N + 1 sums of cosines are computed by the native library. Returns (x, y) with x relative to origin.
+  """
+  if n < 0 or N <= 0: raise ValueError("n must be non-negative and N must be positive.")
+  if min_x >= max_x: raise ValueError("min_x must be less than max_x.")
+  length = groupLength(N)
+  starts, increments = weierstrassEngine.deepGridPhases(b, min_x, max_x, n, N, origin)
+  amplitudes = np.power(float(a), np.arange(n + 1, dtype=np.float64))
+  y_values = np.empty(length, dtype=np.float64)
+
+  written = loadLibrary().weierstrassGroupDeep_into(amplitudes, starts, increments, n, N, y_values, length, threads)
+  if written == WEIERSTRASS_ERR_ARGS: raise ValueError("The native library rejected the Weierstrass parameters.")
+  if written == WEIERSTRASS_ERR_BUFFER: raise ValueError("The native library rejected the output buffers.")
+  return weierstrassEngine.gridX(float(min_x), float(max_x), N), y_values
+
+def weierstrassGroupFloat32(a: float, b: float, min_x: float, max_x: float, n: int = 0, N: int = 100, threads: int = 0):
+  """
+  Same contract as weierstrassEngine.weierstrassGroupFloat32, computed by the native float kernel.
+  Returns the float32 arrays (x, y).
+  """
+  if n < 0 or N <= 0: raise ValueError("n must be non-negative and N must be positive.")
+  if min_x >= max_x: raise ValueError("min_x must be less than max_x.")
+  length = groupLength(N)
+  x_values = np.empty(length, dtype=np.float32)
+  y_values = np.empty(length, dtype=np.float32)
+
+  written = loadLibrary().weierstrassGroupFloat_into(a, b, min_x, max_x, n, N, x_values, y_values, length, threads)
+  if written == WEIERSTRASS_ERR_ARGS: raise ValueError("The native library rejected the Weierstrass parameters.")
+  if written == WEIERSTRASS_ERR_BUFFER: raise ValueError("The native library rejected the output buffers.")
+  return x_values, y_values
+
+def weierstrassGroupMode(a: float, b: float, min_x: float, max_x: float, n: int = 0, N: int = 100, float32: bool = True, budget: float = weierstrassEngine.FLOAT32_ERROR_BUDGET, threads: int = 0):
+  """
+  Same contract as weierstrassEngine.weierstrassGroupMode with the native kernels, returns (x, y, mode)
+  """
+  mode = weierstrassEngine.evaluationMode(a, b, n, min_x, max_x, float32, budget)
+  if mode == "float32": return (*weierstrassGroupFloat32(a, b, min_x, max_x, n, N, threads), mode)
+  return (*weierstrassGroup(a, b, min_x, max_x, n, N, threads), mode)
+
+def weierstrassGroup(a: float, b: float, min_x: float, max_x: float, n: int = 0, N: int = 100, threads: int = 0):
+  """
+  Same contract as weierstrassEngine.weierstrassGroup, computed by the native library
+  on every hardware thread unless threads says otherwise.
+  For an integer b only the first period of the grid is computed, the rest is tiled.
+  Returns the float64 arrays (x, y).
+  """
+  if N <= 0: raise ValueError("n must be non-negative and N must be positive.")
+  if min_x >= max_x: raise ValueError("min_x must be less than max_x.")
+  period = weierstrassEngine.groupPeriod(b, min_x, max_x, N)
+  if period is not None:
+    x_values = weierstrassEngine.gridX(min_x, max_x, N)
+    if period == 1: y_period = np.array([weierstrass(a, b, min_x, n)])
+    else: _, y_period = weierstrassGroup(a, b, min_x, x_values[period - 1], n, period - 1, threads)
+    return x_values, weierstrassEngine.tilePeriod(y_period, N + 1)
+
+  x_values = np.empty(N + 1, dtype=np.float64)
+  y_values = np.empty(N + 1, dtype=np.float64)
+  weierstrassGroupInto(a, b, min_x, max_x, n, N, x_values, y_values, threads)
+  return x_values, y_values